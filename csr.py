@@ -0,0 +1,344 @@
+"""COMPRESSED SPARSE ROW (CSR) GRAPH
+
+A CSR graph is a frozen adjacency-list representation in which all adjacency
+lists are concatenated into one contiguous array, i.e.
+* targets[offsets[v]:offsets[v+1]] are the vertices adjacent to v;
+* weights[offsets[v]:offsets[v+1]] are the weights of those edges (optional).
+
+  offsets | 0 2 3 3 5        vertex 0 -> 1, 2
+  targets | 1 2 0 1 2        vertex 1 -> 0
+  weights | . . . . .        vertex 2 -> (none)
+                             vertex 3 -> 1, 2
+
+  representation | space          | add edge | iterate over v | locality
+---------------------------------------------------------------------------
+linked-list bags | E PyObjects    | 1        | degree(v)      | scattered
+             CSR | (V+1) + 2E ints| rebuild  | degree(v)      | contiguous
+---------------------------------------------------------------------------
+
+Each "arc" (directed half of an edge) is identified by its position e in the
+targets array. An undirected edge v-w is stored as two arcs v->w and w->v, so
+an undirected CSR graph holds 2E arcs (a self-loop v-v also takes two arcs).
+
+The arrays are typed (array("l") for indices, array("d") for weights), so
+each arc costs 8 or 16 bytes instead of a linked-list node and an edge object.
+Any sequence supporting len/index/slice works as storage, which allows the
+arrays to be memoryviews over a memory-mapped file.
+
+FILE FORMATS
+text   -- algs4 edge list, i.e. V, E, then E lines of "v w [weight]"; parsed 
+          in chunks of whole lines so memory stays bounded by the arrays;
+binary -- 24-byte header (magic, flags, V, number of arcs) followed by the 
+          offsets, targets and weights arrays as native 8-byte values, so 
+          load() can map them into memory without parsing (zero copy).
+"""
+
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+import mmap
+import struct
+
+MAGIC = b"CSR1"
+HEADER = struct.Struct("=4sIqq") #magic, flags, V, number of arcs
+DIRECTED, WEIGHTED = 1, 2 #header flags
+
+
+class CSRGraph:
+	"""Frozen graph in compressed sparse row representation"""
+	def __init__(self, V, offsets, targets, weights=None, directed=False):
+		"""Wrap prebuilt CSR arrays (offsets has V+1 entries)"""
+		if len(offsets) != V + 1:
+			raise ValueError("Offsets must have V+1 entries")
+		if len(targets) != offsets[V]:
+			raise ValueError("Targets must have offsets[V] entries")
+		if weights is not None and len(weights) != len(targets):
+			raise ValueError("Weights must be parallel to targets")
+		self.offsets = offsets
+		self.targets = targets
+		self.weights = weights
+		self.directed = directed
+		self._V = V
+
+	@classmethod
+	def from_arrays(cls, V, src, dst, weight=None, directed=False):
+		"""Build a CSR graph in bulk from parallel edge arrays ~ O(V + E)
+
+		The arcs are placed by a (stable) counting sort on their tail vertex,
+		so the relative order of edges incident to a vertex is preserved.
+		"""
+		E = len(src)
+		if len(dst) != E or weight is not None and len(weight) != E:
+			raise ValueError("Edge arrays must have the same length")
+		offsets = array("l", [0]) * (V+1)
+		for v in src: offsets[v+1] += 1
+		if not directed:
+			for w in dst: offsets[w+1] += 1
+		for v in range(V): offsets[v+1] += offsets[v]
+
+		cursor = array("l", offsets[:V]) #next free slot of each vertex
+		targets = array("l", [0]) * offsets[V]
+		weights = None if weight is None else array("d", [0.0]) * offsets[V]
+		for i in range(E):
+			v, w = src[i], dst[i]
+			targets[cursor[v]] = w
+			if weights is not None: weights[cursor[v]] = weight[i]
+			cursor[v] += 1
+			if not directed:
+				targets[cursor[w]] = v
+				if weights is not None: weights[cursor[w]] = weight[i]
+				cursor[w] += 1
+		return cls(V, offsets, targets, weights, directed)
+
+	@classmethod
+	def from_edges(cls, V, edges, directed=False):
+		"""Build a CSR graph from an iterable of (v, w) or (v, w, weight)"""
+		src, dst, wt = array("l"), array("l"), array("d")
+		weighted = None
+		for edge in edges:
+			if weighted is None: weighted = len(edge) == 3
+			src.append(edge[0])
+			dst.append(edge[1])
+			if weighted: wt.append(edge[2])
+		return cls.from_arrays(V, src, dst, wt if weighted else None, directed)
+
+	def __iter__(self):
+		"""Return iterator to loop through vertices"""
+		return iter(range(self._V))
+
+	def __len__(self):
+		"""Return number of vertices"""
+		return self._V
+
+	def __repr__(self):
+		"""Return string representation of graph"""
+		ans = ""
+		for v in self:
+			ans += str(v) + ": " + ", ".join(map(str, self.adjacent(v))) + "\n"
+		return ans
+
+	def V(self):
+		"""Return number of vertices"""
+		return self._V
+
+	def E(self):
+		"""Return number of edges (each undirected edge counted once)"""
+		return len(self.targets) if self.directed else len(self.targets)//2
+
+	def adjacent(self, v):
+		"""Return the adjacent vertices of given vertex (a slice, not a copy
+		when storage is a memoryview)"""
+		return self.targets[self.offsets[v]:self.offsets[v+1]]
+
+	def arcs(self, v):
+		"""Return range of arc indices leaving v"""
+		return range(self.offsets[v], self.offsets[v+1])
+
+	def tail(self, e):
+		"""Return the vertex arc e leaves from ~ O(log(V))"""
+		return lower_bound(self.offsets, e + 1, 0, self._V) - 1
+
+	def degree(self, v):
+		"""Return the (out-)degree of given vertex"""
+		return self.offsets[v+1] - self.offsets[v]
+
+	def weight(self, e):
+		"""Return weight of arc e (1 for unweighted graphs)"""
+		return 1.0 if self.weights is None else self.weights[e]
+
+	def edges(self):
+		"""Yield each edge once as (v, w, weight)"""
+		for v, w, e in self._edges():
+			yield v, w, self.weight(e)
+
+	def _edges(self):
+		"""Yield each edge once as (v, w, arc index)"""
+		offsets, targets = self.offsets, self.targets
+		for v in range(self._V):
+			loops = 0
+			for e in range(offsets[v], offsets[v+1]):
+				w = targets[e]
+				if self.directed or v < w:
+					yield v, w, e
+				elif v == w: #self-loop is stored as two arcs
+					if loops % 2 == 0: yield v, w, e
+					loops += 1
+
+	def edge_arrays(self):
+		"""Return parallel (src, dst, weight) arrays with each edge once"""
+		src, dst, wt = array("l"), array("l"), array("d")
+		for v, w, e in self._edges():
+			src.append(v)
+			dst.append(w)
+			wt.append(self.weight(e))
+		return src, dst, wt
+
+	def save(self, path):
+		"""Write the graph in binary CSR format (see load)"""
+		flags = DIRECTED * self.directed | WEIGHTED * (self.weights is not None)
+		with open(path, "wb") as f:
+			f.write(HEADER.pack(MAGIC, flags, self._V, len(self.targets)))
+			write_arrays(f, (self.offsets, "q"), (self.targets, "q"), 
+			             *[(self.weights, "d")] * (self.weights is not None))
+
+	def reverse(self):
+		"""Return the reverse of a directed graph (itself if undirected)"""
+		if not self.directed: return self
+		src = array("l", [0]) * len(self.targets)
+		for v in range(self._V):
+			for e in range(self.offsets[v], self.offsets[v+1]): src[e] = v
+		return CSRGraph.from_arrays(self._V, self.targets, src, self.weights, True)
+
+
+def as_csr(graph):
+	"""Return a CSR view of given graph
+
+	Accepts a CSRGraph (returned as is) or any adjacency-list graph of this
+	library, i.e. Graph/Digraph (adjacent(v) yields vertices) and
+	EdgeWeightedGraph/EdgeWeightedDigraph (adj(v) yields edges). Adjacency
+	lists are copied arc by arc, so undirected graphs keep both directions.
+	"""
+	if isinstance(graph, CSRGraph): return graph
+	V = len(graph)
+	directed = getattr(graph, "directed", False)
+	weighted = hasattr(graph, "adj")
+	offsets = array("l", [0]) * (V+1)
+	targets = array("l")
+	weights = array("d") if weighted else None
+	for v in range(V):
+		if weighted:
+			for edge in graph.adj(v):
+				targets.append(edge.to() if directed else edge.other(v))
+				weights.append(edge.weight())
+		else:
+			targets.extend(graph.adjacent(v))
+		offsets[v+1] = len(targets)
+	return CSRGraph(V, offsets, targets, weights, directed)
+
+
+def lower_bound(a, x, lo=0, hi=None):
+	"""Return the first index i in lo..hi-1 with a[i] >= x in sorted a (hi if
+	none), i.e. bisect_left; the flat layout shadows the stdlib bisect with 
+	the repo's own bisect.py"""
+	if hi is None: hi = len(a)
+	while lo < hi: 
+		mid = lo + hi >> 1
+		if a[mid] < x: lo = mid + 1
+		else: hi = mid
+	return lo
+
+
+def _typed(data, code):
+	"""Return data as a buffer of 8-byte items of given typecode (no copy if 
+	it already is one, e.g. array("l") on LP64 platforms)"""
+	if isinstance(data, (array, memoryview)):
+		view = memoryview(data)
+		if view.itemsize == 8 and (view.format == "d") == (code == "d"): return view
+	return array(code, data)
+
+
+def write_arrays(f, *arrays):
+	"""Write (data, typecode) pairs back to back as native 8-byte items"""
+	for data, code in arrays: f.write(_typed(data, code))
+
+
+def read_header(path, header, magic, kind, mapped=True):
+	"""Open a binary file that starts with header (a struct.Struct whose first
+	field is magic; kind names the format in errors) and return (the other 
+	header fields, buffer of the whole file), memory-mapped if mapped or else
+	read into memory"""
+	with open(path, "rb") as f:
+		data = f.read(header.size)
+		if len(data) < header.size or data[:len(magic)] != magic: 
+			raise ValueError(f"{path} is not {kind}")
+		if mapped: 
+			buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+		else: 
+			f.seek(0)
+			buf = memoryview(f.read())
+	return header.unpack(data)[1:], buf
+
+
+def map_arrays(path, buf, lo, sizes, mapped=True):
+	"""Return the arrays of given (typecode, n) sizes stored back to back in 
+	buf from offset lo, as views into buf if mapped (zero copy) else copies"""
+	arrays = []
+	for code, n in sizes: 
+		if len(buf) < lo + 8*n: raise ValueError(f"{path} is truncated")
+		view = buf[lo:lo + 8*n].cast(code)
+		arrays.append(view if mapped else array(code, view))
+		lo += 8*n
+	return arrays
+
+
+def share(data):
+	"""Copy a typed array into a new shared memory block (for worker 
+	processes, which attach by name and cast the buffer to its typecode)"""
+	view = memoryview(data).cast("B")
+	shm = SharedMemory(create=True, size=max(8, len(view)))
+	shm.buf[:len(view)] = view
+	return shm
+
+
+def attach(name, code, n):
+	"""Attach to a block made by share() and return (block, view of its 
+	first n items of given typecode); release the view before closing"""
+	shm = SharedMemory(name=name)
+	return shm, shm.buf[:n*array(code).itemsize].cast(code)
+
+
+def load(path, mapped=True):
+	"""Load a graph written by CSRGraph.save
+
+	With mapped=True the file is memory-mapped and the CSR arrays are 
+	memoryviews into the mapping, i.e. nothing is parsed or copied and pages
+	are faulted in lazily by the OS. Otherwise the arrays are read into memory.
+	"""
+	(flags, V, A), buf = read_header(path, HEADER, MAGIC, "a binary CSR graph", mapped)
+	weighted = flags & WEIGHTED
+	sizes = [("q", V+1), ("q", A)] + [("d", A)] * bool(weighted)
+	arrays = map_arrays(path, buf, HEADER.size, sizes, mapped)
+	offsets, targets = arrays[:2]
+	weights = arrays[2] if weighted else None
+	return CSRGraph(V, offsets, targets, weights, bool(flags & DIRECTED))
+
+
+def read_edgelist(path, directed=False, weighted=None, chunk=1<<22):
+	"""Stream an algs4-style text edge list into a CSR graph
+
+	The file is consumed in chunks of about chunk bytes (whole lines), and 
+	each chunk is tokenized and converted in bulk to typed arrays. Weighted 
+	is inferred from the first edge line when not given. Every non-blank 
+	edge line must have exactly 2 (3 if weighted) fields.
+	"""
+	src, dst, wt = array("l"), array("l"), array("d")
+	with open(path) as f:
+		header, n = [], 0 #n -- number of lines read
+		while len(header) < 2: #V and E, possibly on one line
+			line = f.readline()
+			if not line: raise ValueError(f"{path} has no V/E header")
+			n += 1
+			header.extend(line.split())
+		V, E = int(header[0]), int(header[1])
+		rows = [header[2:]] if header[2:] else [] #an edge sharing the header line
+		first = n - len(rows) + 1 #line number of rows[0]
+		while True:
+			if weighted is None: #from the first edge line
+				weighted = next((len(row) == 3 for row in rows if row), None)
+			if weighted is not None: 
+				k = 3 if weighted else 2
+				for i, row in enumerate(rows): 
+					if row and len(row) != k: 
+						raise ValueError(f"{path}:{first + i} has {len(row)} fields, expected {k}")
+				tokens = [token for row in rows for token in row]
+				src.extend(map(int, tokens[0::k]))
+				dst.extend(map(int, tokens[1::k]))
+				if weighted: wt.extend(map(float, tokens[2::k]))
+				rows = []
+			lines = f.readlines(chunk)
+			if not lines: break
+			first = n + 1 - len(rows) 
+			rows.extend(line.split() for line in lines)
+			n += len(lines)
+	if len(src) != E: 
+		raise ValueError(f"{path} declares {E} edges but lists {len(src)}")
+	return CSRGraph.from_arrays(V, src, dst, wt if weighted else None, directed)
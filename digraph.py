@@ -5,29 +5,39 @@ DAG -- directed acyclic graph
 topological sort -- redraw DAG so all edges points upward
 """
 
-from graph import Graph
+from graph import Graph, dfs_order, PREORDER, POSTORDER
+from linkedlist import Stack
 
 class Digraph(Graph):
-	""""""
+	"""Digraph in adjacency-list representation (edge v->w only in v's list)"""
+	directed = True
 
 	def add_edge(self, v, w):
-		""""""
-		self.adjacent[v].add(w)
+		"""Add directed edge v->w"""
+		self._adj[v].add(w)
 
 	def count_edges(self):
 		"""Return total number of edges"""
-		return sum(map(len, self.adjacent))
+		return sum(map(len, self._adj))
 
 	def reverse(self):
-		pass
+		"""Return the digraph with all edges reversed"""
+		reverse = Digraph(len(self))
+		for v in self:
+			for w in self.adjacent(v):
+				reverse.add_edge(w, v)
+		return reverse
 
-	def out_degree(self):
-		pass
+	def out_degree(self, v):
+		"""Return number of edges pointing from v"""
+		return len(self._adj[v])
 
-	def in_degree(self):
-		pass
+	def in_degree(self, v):
+		"""Return number of edges pointing to v"""
+		return sum(w == v for u in self for w in self.adjacent(u))
 
 
+"""web crawler (pseudo-code)
 queue = Queue()
 discovered = Set()
 
@@ -48,23 +58,21 @@ while queue:
 		if not discovered.contains(w):
 			discovered.add(w)
 			queue.enqueue(w) 
+"""
 
 """topological sort"""
 class Tpsort:
 	def __init__(self, graph):
-		reverse = Stack()
-		marked = [False]*len(graph)
-		for v in graph:
-			if not marked: self.dfs(graph, v)
+		self.reverse = Stack()
+		self.marked = [False]*len(graph)
+		self.dfs(graph)
 
-	def dfs(self, graph, v):
-		marked[v] = True
-		for w in graph.adjacent(v):
-			if not marked[w]: self.dfs(graph, w)
-		reverse.push(v)
+	def dfs(self, graph, sources=None):
+		for event, v, _ in dfs_order(graph, sources, self.marked):
+			if event == POSTORDER: self.reverse.push(v)
 
 	def reverse_post(self):
-		return reverse 
+		return self.reverse 
 
 
 #Kosaraju-Sharir algorithm 
@@ -79,19 +87,185 @@ class KosarajuSharirSCC:
 		self.marked = [False] * len(graph)
 		self.id = [None] * len(graph)
 		self.count = 0
-		dfs = depth_first(graph.reverse())
-		for v in dfs.reversePost():
-			if not self.marked[v]:
-				self.dfs(graph, v)
-				self.count += 1
-
-	def dfs(self, graph, v):
-		self.marked[v] = True
-		self.id[v] = self.count 
-		for w in graph.adj(v):
-			if not marked[w]:
-				self.dfs(graph, w)
+		dfs = Tpsort(graph.reverse()) #reverse postorder of reverse graph
+		self.dfs(graph, dfs.reverse_post())
+
+	def dfs(self, graph, order):
+		"""One DFS tree per strong component, roots taken in given order"""
+		for event, v, parent in dfs_order(graph, order, self.marked):
+			if event == PREORDER: self.id[v] = self.count 
+			elif parent == -1: self.count += 1 #root finished
+
+	def stronglyConnected(self, v, w):
+		return self.id[v] == self.id[w]
+
+
+
+"""Tarjan's algorithm (1972)
+One DFS pass, no reverse graph. Each vertex gets its preorder number pre[v] 
+and low[v], the smallest preorder number reachable from v's DFS subtree via 
+tree edges plus one edge to a vertex still on the stack. Vertices are pushed
+on a stack when discovered; v is the root of a strong component iff 
+low[v] == pre[v] when v finishes, and the component is everything above v 
+on the stack. Components complete in reverse topological order of the 
+kernel DAG, so they are numbered backwards to make ids topological, i.e. 
+every edge between components goes from a lower to a higher id. 
+Time ~ O(V + E); extra space ~ 5 ints per vertex, both DFS stacks explicit.
+"""
+from array import array
+from csr import CSRGraph, as_csr
+
+class TarjanSCC:
+	def __init__(self, graph):
+		graph = self.graph = as_csr(graph)
+		V = len(graph)
+		offsets, targets = graph.offsets, graph.targets
+		self.id = array("l", [-1]) * V
+		self.count = 0
+		pre = array("l", [-1]) * V #preorder number
+		low = array("l", [0]) * V
+		cursor = array("l", offsets[:V]) #next arc to explore per vertex
+		stack = array("l") #vertices without a component, in preorder
+		call = array("l")  #DFS path
+		counter = 0
+		for s in range(V):
+			if pre[s] != -1: continue
+			pre[s] = low[s] = counter
+			counter += 1
+			stack.append(s)
+			call.append(s)
+			while call:
+				v = call[-1]
+				k, end = cursor[v], offsets[v+1]
+				while k < end: 
+					w = targets[k]
+					k += 1
+					if pre[w] == -1: break #tree edge, descend
+					if self.id[w] == -1 and pre[w] < low[v]: low[v] = pre[w] #w on stack
+				else: 
+					w = -1
+				cursor[v] = k
+				if w != -1 and pre[w] == -1: 
+					pre[w] = low[w] = counter
+					counter += 1
+					stack.append(w)
+					call.append(w)
+					continue 
+				call.pop() #v finished
+				if call and low[v] < low[call[-1]]: low[call[-1]] = low[v]
+				if low[v] == pre[v]: #v is root of a strong component
+					while True: 
+						w = stack.pop()
+						self.id[w] = self.count
+						if w == v: break 
+					self.count += 1
+		for v in range(V): self.id[v] = self.count - 1 - self.id[v] #topological ids
 
 	def stronglyConnected(self, v, w):
 		return self.id[v] == self.id[w]
 
+	def condensation(self):
+		"""Return the kernel DAG as a CSR digraph"""
+		return condensation(self.graph, self.id, self.count)
+
+
+def condensation(graph, id, count):
+	"""Return kernel DAG of digraph given component ids (0..count-1) as a CSR 
+	digraph, i.e. one vertex per strong component and one edge c->d for each 
+	pair of components joined by at least one edge ~ O(V + E)"""
+	graph = as_csr(graph)
+	offsets, targets = graph.offsets, graph.targets
+	start = array("l", [0]) * (count+1) #vertices grouped by component 
+	for v in range(len(graph)): start[id[v]+1] += 1
+	for c in range(count): start[c+1] += start[c]
+	members = array("l", [0]) * len(graph)
+	fill = array("l", start[:count])
+	for v in range(len(graph)): 
+		members[fill[id[v]]] = v
+		fill[id[v]] += 1
+	seen = array("l", [-1]) * count #last component that added an edge to d
+	dag_offsets, dag_targets = array("l", [0]), array("l")
+	for c in range(count): 
+		for i in range(start[c], start[c+1]): 
+			v = members[i]
+			for e in range(offsets[v], offsets[v+1]): 
+				d = id[targets[e]]
+				if d != c and seen[d] != c: 
+					seen[d] = c
+					dag_targets.append(d)
+		dag_offsets.append(len(dag_targets))
+	return CSRGraph(count, dag_offsets, dag_targets, directed=True)
+
+
+"""Dynamic topological order (Pearce-Kelly, 2006)
+Maintain ord[v], the position of v in a topological order, while edges are 
+inserted. Adding x->y with ord[x] < ord[y] changes nothing. Otherwise only 
+the affected region ord[y] <= . <= ord[x] can be out of order: 
+* forward search from y over vertices with ord < ord[x] (reaching x means 
+  the edge closes a cycle, which is reported and the edge is not added);
+* backward search from x over vertices with ord > ord[y];
+* the backward set (in order) then the forward set (in order) are put into
+  the positions they occupied before, sorted. 
+Cost is proportional to the edges of the affected region, not to V + E. 
+"""
+
+class DynamicTopo:
+	"""Topological order of a DAG maintained under edge insertions"""
+	def __init__(self, graph):
+		"""graph -- an acyclic Digraph, which add_edge keeps updated"""
+		scc = TarjanSCC(graph) #ids are topological 
+		if scc.count != len(graph): raise ValueError("Digraph has a directed cycle")
+		self.graph = graph
+		self.ord = array("l", scc.id)       #position of each vertex
+		self.at = array("l", [0]) * len(graph) #vertex at each position
+		for v in range(len(graph)): self.at[self.ord[v]] = v
+		self._in = [array("l") for _ in range(len(graph))] #reverse adjacency
+		for v in range(len(graph)): 
+			for w in graph.adjacent(v): self._in[w].append(v)
+		self.cycle = None #cycle closed by the last rejected edge
+
+	def add_edge(self, x, y):
+		"""Add edge x->y, reordering the affected region; raise ValueError 
+		(and keep the digraph unchanged) if it would close a cycle"""
+		ord = self.ord
+		lb, ub = ord[y], ord[x]
+		if x == y: 
+			self.cycle = [x, x]
+			raise ValueError(f"Edge {x}->{y} closes cycle {self.cycle}")
+		if lb < ub: 
+			forward = {y: -1} #vertex -> predecessor on search path
+			stack = [y]
+			while stack: 
+				v = stack.pop()
+				for w in self.graph.adjacent(v): 
+					if w == x: #x reachable from y
+						path = [x, v]
+						while forward[path[-1]] != -1: path.append(forward[path[-1]])
+						self.cycle = [x] + path[::-1]
+						raise ValueError(f"Edge {x}->{y} closes cycle {self.cycle}")
+					if ord[w] < ub and w not in forward: 
+						forward[w] = v
+						stack.append(w)
+			backward = {x}
+			stack = [x]
+			while stack: 
+				v = stack.pop()
+				for u in self._in[v]: 
+					if ord[u] > lb and u not in backward: 
+						backward.add(u)
+						stack.append(u)
+			region = sorted(backward, key=ord.__getitem__) + sorted(forward, key=ord.__getitem__)
+			for v, i in zip(region, sorted(ord[v] for v in region)): 
+				ord[v] = i
+				self.at[i] = v
+		self.graph.add_edge(x, y)
+		self._in[y].append(x)
+		self.cycle = None
+
+	def order(self):
+		"""Return vertices in topological order"""
+		return list(self.at)
+
+	def precedes(self, v, w):
+		"""Return True if v comes before w in the current order"""
+		return self.ord[v] < self.ord[w]
@@ -7,6 +7,10 @@ Graph is a set of vertices connected pairwise by edges;
 list of edges    | E     | 1        | E         | E
 adjacency matrix | V**2  | 1        | 1         | V
 adjacency lists* | E + V | 1        | degree(v) | degree(V)
+compressed rows  | E + V | rebuild  | degree(v) | degree(V)
+
+The compressed sparse row (CSR) form lives in module "csr"; every traversal 
+below only needs len(graph) and graph.adjacent(v), so it accepts both. 
 
    Euler tour - is there a cycle that uses each edge exactly once?
 Hamilton tour - is there a cyCle that uses each vertex exactly once?
@@ -18,7 +22,9 @@ Mark-sweep algorithm (McCarthy, 1960)
 * sweep -- if object is unmarked, it is garbage (so add to free list)
 """
 
-from linkedlist import Bag, Stack, Queue
+from array import array
+from linkedlist import Bag, Stack
+from csr import as_csr
 
 class Graph:
 	"""Graph in adjacency-list representation (array of linked lists)
@@ -26,9 +32,9 @@ class Graph:
 	2) a linked list of vertices that it connects to.
 	"""
 	def __init__(self, vertices):
-		"""Initialize the graph with vertices"""
-		self.vertices = vertices
-		self.adjacent = [Bag()] * vertices
+		"""Initialize the graph with vertices 0, 1, ..., vertices-1"""
+		self.vertices = range(vertices)
+		self._adj = [Bag() for _ in self.vertices] #one bag per vertex (not aliased)
 
 	def __iter__(self):
 		"""Return iterator to loop through vertices"""
@@ -44,22 +50,26 @@ class Graph:
 		for v in self:
 			temp = []
 			for w in self.adjacent(v):
-				temp.append(w)
+				temp.append(str(w))
 			ans += str(v) + ": " + ", ".join(temp) + "\n"
 		return ans
 
 	def add_edge(self, v, w):
 		"""Add edge between vertices v and w"""
-		self.adjacent[v].add(w) #add w to v's adjacent
-		self.adjacent[w].add(v) #add v to w's adjacent
+		self._adj[v].add(w) #add w to v's adjacent
+		self._adj[w].add(v) #add v to w's adjacent
 
 	def adjacent(self, v):
 		"""Return the adjacent vertices of given vertex"""
-		return self.adjacent[v]
+		return self._adj[v]
 
 	def count_edges(self):
 		"""Return total number of edges"""
-		return sum(map(len, self.adjacent))//2
+		return sum(map(len, self._adj))//2
+
+	def to_csr(self):
+		"""Return a frozen compressed sparse row copy of the graph"""
+		return as_csr(self)
 
 	def degree(self, v):
 		"""Return the degree of given vertex"""
@@ -100,7 +110,48 @@ Tremaux maze exploration algorithm
 * unroll a ball of string behind you;
 * mark each visited intersection and each visited passage;
 * retrace steps when no unvisited options.
+
+The ball of string is an explicit stack of vertices plus, per vertex, a cursor
+into its adjacency list (CSR arc index), so no Python frame is pushed per 
+vertex and the depth is only bounded by memory (not the recursion limit). 
 """
+PREORDER, POSTORDER = 0, 1 #traversal events
+
+def dfs_order(graph, sources=None, marked=None):
+	"""Yield (event, v, parent) of an iterative depth-first search
+	* (PREORDER, v, parent) when v is discovered via parent (-1 for a root);
+	* (POSTORDER, v, parent) when all vertices reachable from v are done.
+
+	Searches from each unmarked vertex in sources (all vertices by default) 
+	in turn. marked (length V, updated in place) lets callers share visited 
+	state across calls. Time ~ O(V + E); extra space ~ 2 ints per vertex.
+	"""
+	graph = as_csr(graph)
+	offsets, targets = graph.offsets, graph.targets
+	if marked is None: marked = bytearray(len(graph))
+	cursor = array("l", offsets[:len(graph)]) #next arc to explore per vertex
+	stack = array("l")
+	for s in range(len(graph)) if sources is None else sources:
+		if marked[s]: continue
+		marked[s] = True
+		yield PREORDER, s, -1
+		stack.append(s)
+		while stack:
+			v = stack[-1]
+			k, end = cursor[v], offsets[v+1]
+			while k < end and marked[targets[k]]: k += 1 #skip visited 
+			if k < end: 
+				cursor[v] = k + 1
+				w = targets[k]
+				marked[w] = True
+				yield PREORDER, w, v
+				stack.append(w)
+			else:
+				cursor[v] = k
+				stack.pop()
+				yield POSTORDER, v, stack[-1] if stack else -1
+
+
 class Traverse:
 	def __init__(self, graph, source):
 		"""Initialize depth-first search over graph on given source"""
@@ -120,7 +171,7 @@ class Traverse:
 		"""Return the paths to a vertex"""
 		if not self.connected(v): return None
 		path = Stack()
-		while v != self.source:
+		while self.edgeto[v] is not None: #stop at a source
 			path.push(v)
 			v = self.edgeto[v]
 		path.push(v)
@@ -130,18 +181,16 @@ class Traverse:
 class DFS(Traverse):
 	"""Depth-First Search (Tremaux maze exploration)
 	Algorithm
-	1) use recursion (ball of string);
+	1) use an explicit stack (ball of string);
 	2) mark each visited vertex (and keep track of edge taken to visit it);
 	3) return (retrace steps) when no unvisited options.
 	"""
 	def _traverse(self, graph, s):
 		"""DFS marks all vertices connected in time proportional to the sum 
 		of degrees"""
-		self.marked[v] = True
-		for w in graph.adjacent(v):
-			if not self.marked[w]:
-				self._dfs(graph, w)
-				self.edgeto[w] = v
+		for event, v, parent in dfs_order(graph, [s], self.marked):
+			if event == PREORDER and parent != -1: 
+				self.edgeto[v] = parent
 
 
 class BFS(Traverse):
@@ -151,17 +200,134 @@ class BFS(Traverse):
 	2) repeat until the queue is empty:
 	- remove the least recently added vertex v
 	- add each of v's unvisited neighbors to the queue, and mark them as visited
+
+	Level-synchronous implementation -- the FIFO queue is replaced by whole 
+	frontier arrays (all vertices at distance d), expanded one level at a time.
+	Sources may be a single vertex or a list of seeds (multi-source BFS). 
+
+	Direction-optimizing (Beamer 2012) -- when the frontier gets "heavy", i.e. 
+	its out-arcs exceed 1/alpha of the arcs still unexplored, switch to the 
+	bottom-up step where every unvisited vertex scans its (in-)neighbors and 
+	stops at the first one on the frontier; switch back to top-down once the 
+	frontier holds fewer than V/beta vertices. 
 	"""
-	def _traverse(self, graph, s):
-		queue = Queue()
-		queue.enqueue(s)
-		while queue:
-			v = queue.dequeue()
-			for w in graph.adjacent(v):
-				if not marked[w]:
-					queue.enqueue(w)
-					marked[w] = True
-					edgeto[w] = v 
+	alpha, beta = 14, 24
+
+	def __init__(self, graph, sources, bottom_up=True):
+		"""Initialize breadth-first search over graph from given source(s)"""
+		self.bottom_up = bottom_up
+		self.distto = [None] * len(graph)
+		super().__init__(graph, sources)
+
+	def _traverse(self, graph, sources):
+		graph = as_csr(graph)
+		offsets, targets = graph.offsets, graph.targets
+		marked, edgeto, distto = self.marked, self.edgeto, self.distto
+		frontier = array("l")
+		for s in [sources] if isinstance(sources, int) else sources:
+			if not marked[s]:
+				marked[s] = True
+				distto[s] = 0
+				frontier.append(s)
+		unexplored = len(targets) - sum(graph.degree(v) for v in frontier)
+		reverse, top_down, level = None, True, 0
+		while frontier:
+			level += 1
+			if self.bottom_up: 
+				scout = sum(offsets[v+1] - offsets[v] for v in frontier)
+				if top_down and scout > unexplored / self.alpha: 
+					top_down = False
+				elif not top_down and len(frontier) < len(graph) / self.beta: 
+					top_down = True
+			nxt = array("l")
+			if top_down: 
+				for v in frontier:
+					for k in range(offsets[v], offsets[v+1]):
+						w = targets[k]
+						if not marked[w]:
+							marked[w] = True
+							edgeto[w] = v
+							distto[w] = level
+							nxt.append(w)
+			else: 
+				if reverse is None: reverse = graph.reverse() #in-neighbors
+				roffsets, rtargets = reverse.offsets, reverse.targets
+				infront = bytearray(len(graph))
+				for v in frontier: infront[v] = 1
+				for w in range(len(graph)):
+					if marked[w]: continue
+					for k in range(roffsets[w], roffsets[w+1]):
+						v = rtargets[k]
+						if infront[v]: #first parent found, skip remaining arcs
+							marked[w] = True
+							edgeto[w] = v
+							distto[w] = level
+							nxt.append(w)
+							break
+			for w in nxt: unexplored -= offsets[w+1] - offsets[w]
+			frontier = nxt
+
+
+class BidirectionalBFS:
+	"""Shortest s-t path (fewest edges) via two BFS meeting in the middle
+
+	Alternately expand one whole level of the smaller frontier (forward from s 
+	and backward to t along reversed arcs) until the frontiers meet. With 
+	branching factor b and distance d, it touches ~ 2*b**(d/2) instead of b**d 
+	vertices. 
+	"""
+	def __init__(self, graph, s, t):
+		graph = as_csr(graph)
+		V = len(graph)
+		self.s, self.t = s, t
+		self.dist = None #length of shortest s-t path (None if unreachable)
+		self.meet = None #vertex where the two searches met 
+		self.edgeto = [[None] * V, [None] * V] #parents toward s / toward t
+		distto = [[None] * V, [None] * V]
+		distto[0][s] = distto[1][t] = 0
+		if s == t: 
+			self.dist, self.meet = 0, s
+			return 
+		sides = [(graph.offsets, graph.targets)]
+		reverse = graph.reverse()
+		sides.append((reverse.offsets, reverse.targets))
+		frontiers = [array("l", [s]), array("l", [t])]
+		while frontiers[0] and frontiers[1]: 
+			i = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+			offsets, targets = sides[i]
+			edgeto, mine, other = self.edgeto[i], distto[i], distto[1-i]
+			nxt = array("l")
+			for v in frontiers[i]: 
+				for k in range(offsets[v], offsets[v+1]): 
+					w = targets[k]
+					if mine[w] is not None: continue 
+					mine[w] = mine[v] + 1
+					edgeto[w] = v
+					nxt.append(w)
+					if other[w] is not None and (self.dist is None or mine[w] + other[w] < self.dist):
+						self.dist, self.meet = mine[w] + other[w], w
+			if self.dist is not None: return #frontiers met (level completed)
+			frontiers[i] = nxt
+
+	def connected(self):
+		"""Return True if t is reachable from s"""
+		return self.dist is not None
+
+	def path(self):
+		"""Return the vertices on a shortest s-t path"""
+		if not self.connected(): return None
+		path = Stack()
+		v = self.meet
+		while v is not None: #meet -> t (pushed first, so popped last)
+			path.push(v)
+			v = self.edgeto[1][v]
+		temp = Stack()
+		while path: temp.push(path.pop())
+		v = self.edgeto[0][self.meet]
+		while v is not None: #meet -> s
+			temp.push(v)
+			v = self.edgeto[0][v]
+		return temp
 
 
 """
@@ -171,29 +337,100 @@ The relation "is connected to" is an equivalence relation:
 3) transitive: if v is connected to w and w is connected to x, v is connected to x.
 
 A connected component is a maxial set of connected vertices. 
+
+Parallel labeling -- the vertices are split into ranges with about the same 
+number of arcs, each worker process runs union-find over the arcs of its 
+range (on local ids of the vertices it touches, so O(slice) space), and the 
+partial forests (pairs v -> root) are merged by a final union-find pass. The
+CSR arrays are handed to workers via shared memory, so only the compact 
+forests travel back through pickling. 
 """
+from concurrent.futures import ProcessPoolExecutor
+from unionfind import UnionFind
+from csr import share, attach, lower_bound
+
+def _forest(specs, lo, hi):
+	"""Worker -- union-find over arcs leaving vertices lo..hi-1, returned as
+	flat (v, root) pairs for every non-root vertex it touched
+
+	Local ids are v-lo for the range and then one per outside target, so a
+	worker needs space for its slice only (not for all V vertices).
+	"""
+	(shm1, offsets), (shm2, targets) = (attach(*spec) for spec in specs)
+	blocks = [shm1, shm2]
+	try: 
+		uf = UnionFind(hi - lo)
+		outside = {} #vertex -> local id
+		for v in range(lo, hi):
+			for k in range(offsets[v], offsets[v+1]): 
+				w = targets[k]
+				if lo <= w < hi: j = w - lo
+				else: 
+					j = outside.get(w)
+					if j is None: j = outside[w] = uf.add()
+				uf.union(v - lo, j)
+	finally: 
+		offsets.release()
+		targets.release()
+		for shm in blocks: shm.close()
+	vertex = array("l", range(lo, hi)) #local id -> vertex
+	vertex.extend(outside)
+	pairs = array("l")
+	for j in range(len(vertex)):
+		root = uf.find(j)
+		if root != j: pairs.extend((vertex[j], vertex[root]))
+	return pairs.tobytes()
+
+
 class CComponent:
 	"""Initialize all vertices v as unmarked.
 	For each unmarked vertex v, run DFS to identify all vertices discovered as part of the same component.
 	"""
-	def __init__(self, graph):
-		"""Initilize vertices as unmarked"""
+	def __init__(self, graph, workers=None):
+		"""Initilize vertices as unmarked (workers > 1 labels in parallel)"""
 		self.marked = [False]*len(graph)
 		self.id = [None]*len(graph)
 		self.count = 0
-		for v in graph:
-			if not self.marked[v]:
-				self._dfs(graph, v)
+		if workers and workers > 1: self._parallel(graph, workers)
+		else: self._dfs(graph)
+
+	def _parallel(self, graph, workers):
+		"""Union-find over arc partitions in a process pool"""
+		graph = as_csr(graph)
+		V, A = len(graph), len(graph.targets)
+		offsets, targets = array("l", graph.offsets), array("l", graph.targets)
+		blocks = [share(offsets), share(targets)]
+		try: 
+			cuts = [lower_bound(offsets, A*i//workers) for i in range(workers)] + [V]
+			with ProcessPoolExecutor(workers) as pool:
+				specs = [(blocks[0].name, "l", V+1), (blocks[1].name, "l", A)]
+				futures = [pool.submit(_forest, specs, lo, hi)
+				           for lo, hi in zip(cuts, cuts[1:]) if lo < hi]
+				uf = UnionFind(V)
+				for future in futures:
+					pairs = array("l")
+					pairs.frombytes(future.result())
+					for i in range(0, len(pairs), 2): uf.union(pairs[i], pairs[i+1])
+		finally: 
+			for shm in blocks: 
+				shm.close()
+				shm.unlink()
+		label = {}
+		for v in range(V):
+			root = uf.find(v)
+			if root not in label: label[root] = len(label)
+			self.id[v] = label[root]
+			self.marked[v] = True
+		self.count = len(label)
+
+	def _dfs(self, graph):
+		"""Depth-first search (one tree per component)"""
+		for event, v, parent in dfs_order(graph, marked=self.marked):
+			if event == PREORDER: 
+				self.id[v] = self.count
+			elif parent == -1: #root finished
 				self.count += 1
 
-	def _dfs(self, graph, v):
-		"""Depth-first search"""
-		self.marked[v] = True
-		self.id[v] = count
-		for w in graph.adjacent(v):
-			if not marked[w]:
-				self._dfs(graph, w)
-
 	def connected(self, v, w):
 		"""Return true if two vertices are connected"""
 		return self.id[v] == self.id[w]
@@ -223,4 +460,214 @@ Euler tour         | 2
 Hamiltonian tour   | 4 (traveling sales man)
 graph isomorphism  | 5
 planariry problem  | 3 (Tarjan)
-"""
\ No newline at end of file
+"""
+
+"""BICONNECTIVITY
+bridge -- an edge whose removal disconnects its component;
+articulation point -- a vertex whose removal disconnects its component;
+biconnected component -- a maximal set of edges in which every two edges lie
+on a common simple cycle (a bridge forms a component by itself). 
+
+Tarjan (1972) -- one DFS; pre[v] is the preorder number of v and low[v] the 
+smallest preorder number reachable from v's subtree via tree edges plus one 
+back edge. For the tree edge p-v:
+* low[v] >  pre[p] -- p-v is a bridge;
+* low[v] >= pre[p] -- p is an articulation point (a root iff it has 2+ 
+  children), and the edges pushed on an edge stack since p-v form a 
+  biconnected component.
+Only the arc used to enter v is skipped on the way back to its parent, so 
+parallel edges are not bridges. Both stacks are explicit arrays and every 
+DFS root is searched, so all components are covered. Time ~ O(V + E).
+"""
+
+class Biconnected:
+	"""Bridges, articulation points and biconnected components"""
+	def __init__(self, graph):
+		graph = as_csr(graph)
+		V = len(graph)
+		offsets, targets = graph.offsets, graph.targets
+		pre = array("l", [-1]) * V #preorder number
+		low = array("l", [0]) * V
+		parent = array("l", [-1]) * V
+		cursor = array("l", offsets[:V]) #next arc to explore per vertex
+		skipped = bytearray(V) #arc back to parent seen once already
+		self.cut = bytearray(V) #cut[v] -- v is an articulation point
+		self.bridges = []    #edges (p, v)
+		self.components = [] #lists of edges (v, w)
+		edges = array("l") #edge stack, flat (v, w) pairs
+		call = array("l")  #DFS path
+		counter = 0
+		for s in range(V):
+			if pre[s] != -1: continue
+			pre[s] = low[s] = counter
+			counter += 1
+			children = 0
+			call.append(s)
+			while call:
+				v = call[-1]
+				k, end = cursor[v], offsets[v+1]
+				w = -1
+				while k < end:
+					x = targets[k]
+					k += 1
+					if pre[x] == -1: #tree edge, descend
+						w = x
+						break 
+					if x == parent[v] and not skipped[v]: 
+						skipped[v] = 1
+					elif pre[x] < pre[v]: #back edge (pushed from lower end only)
+						edges.extend((v, x))
+						if pre[x] < low[v]: low[v] = pre[x]
+				cursor[v] = k
+				if w != -1: 
+					parent[w] = v
+					pre[w] = low[w] = counter
+					counter += 1
+					edges.extend((v, w))
+					call.append(w)
+					if v == s: children += 1
+					continue 
+				call.pop() #v finished
+				p = parent[v]
+				if p == -1: continue 
+				if low[v] < low[p]: low[p] = low[v]
+				if low[v] > pre[p]: self.bridges.append((p, v))
+				if low[v] >= pre[p]: 
+					if p != s: self.cut[p] = 1
+					component = []
+					while True: 
+						b, a = edges.pop(), edges.pop()
+						component.append((a, b))
+						if a == p and b == v: break 
+					self.components.append(component)
+			if children > 1: self.cut[s] = 1
+		self.articulation = [v for v in range(V) if self.cut[v]]
+
+	def is_articulation(self, v):
+		"""Return True if removing v disconnects its component"""
+		return bool(self.cut[v])
+
+	def count(self):
+		"""Return number of biconnected components"""
+		return len(self.components)
+
+	def vertices(self, i):
+		"""Return vertices of i-th biconnected component"""
+		return sorted({v for edge in self.components[i] for v in edge})
+
+
+"""EULERIAN PATH
+An Eulerian path uses every edge exactly once (a circuit if it ends where it
+starts). Degree precheck (Euler, 1736): 
+* undirected -- 0 vertices of odd degree (circuit) or 2 (path between them);
+* directed   -- in == out everywhere (circuit), or one vertex with out = in+1
+  (start), one with in = out+1 (end) and in == out elsewhere;
+plus all edges in one connected component, which is checked by the path 
+length afterwards (E+1 vertices). 
+
+Hierholzer (1873) -- walk unused edges from the start until stuck, pushing 
+vertices on a stack; when the top vertex has no unused edge left, pop it onto
+the path. The popped sequence reversed is the Eulerian path ~ O(V + E). A 
+cursor per vertex marks the next unused arc, so the graph is not mutated; 
+an undirected edge is indexed once and both of its arcs refer to that index,
+so using it from one end also uses it from the other. 
+"""
+try: 
+	import numpy as np
+except ImportError: #pure-Python degree count
+	np = None
+
+class Eulerian:
+	"""Eulerian path or circuit of a Graph or Digraph (or CSR graph)"""
+	def __init__(self, graph):
+		graph = as_csr(graph)
+		V = len(graph)
+		self.circuit = False
+		self._path = None 
+		start = self._precheck(graph)
+		if start is None: return 
+		if graph.directed: 
+			offsets, targets = graph.offsets, graph.targets
+			edge_of, E = None, len(targets)
+		else: 
+			offsets, targets, edge_of = self._arcs(graph)
+			E = len(targets)//2
+		cursor = array("l", offsets[:V])
+		used = bytearray(E) if edge_of is not None else None 
+		stack = array("l", [start])
+		path = array("l")
+		while stack: 
+			v = stack[-1]
+			k, end = cursor[v], offsets[v+1]
+			if used is not None: 
+				while k < end and used[edge_of[k]]: k += 1 #skip edges used from other end
+			if k < end: 
+				cursor[v] = k + 1
+				if used is not None: used[edge_of[k]] = 1
+				stack.append(targets[k])
+			else: 
+				cursor[v] = k
+				path.append(stack.pop())
+		if len(path) != E + 1: return #edges in more than one component
+		path.reverse()
+		self._path = path
+		self.circuit = path[0] == path[-1]
+
+	@staticmethod
+	def _precheck(graph):
+		"""Return start vertex if the degrees allow an Eulerian path, else None"""
+		V, offsets, targets = len(graph), graph.offsets, graph.targets
+		if not len(targets): return 0 if V else None
+		if np is not None: #out-degree minus in-degree (directed) or degree parity
+			balance = np.diff(np.asarray(offsets, dtype=np.int64))
+			if graph.directed: balance -= np.bincount(np.asarray(targets, dtype=np.int64), minlength=V)
+			else: balance %= 2
+			unbalanced = {v: int(balance[v]) for v in np.flatnonzero(balance)[:3].tolist()}
+		else: 
+			balance = array("l", (offsets[v+1] - offsets[v] for v in range(V)))
+			if graph.directed: 
+				for w in targets: balance[w] -= 1
+			unbalanced = {}
+			for v in range(V): 
+				b = balance[v] if graph.directed else balance[v] % 2
+				if b: unbalanced[v] = b
+				if len(unbalanced) > 2: break 
+		if not unbalanced: #circuit, from any vertex with an edge
+			return next(v for v in range(V) if offsets[v+1] > offsets[v])
+		if len(unbalanced) != 2: return None 
+		if not graph.directed: return min(unbalanced)
+		start, end = sorted(unbalanced, key=unbalanced.get, reverse=True)
+		return start if unbalanced[start] == 1 and unbalanced[end] == -1 else None
+
+	@staticmethod
+	def _arcs(graph):
+		"""Return (offsets, targets, edge_of) with each undirected edge given 
+		one index shared by its two arcs"""
+		V = len(graph)
+		src, dst, _ = graph.edge_arrays()
+		offsets = array("l", [0]) * (V+1)
+		for v in src: offsets[v+1] += 1
+		for w in dst: offsets[w+1] += 1
+		for v in range(V): offsets[v+1] += offsets[v]
+		fill = array("l", offsets[:V])
+		targets = array("l", [0]) * offsets[V]
+		edge_of = array("l", [0]) * offsets[V]
+		for i in range(len(src)): 
+			v, w = src[i], dst[i]
+			targets[fill[v]], edge_of[fill[v]] = w, i
+			fill[v] += 1
+			targets[fill[w]], edge_of[fill[w]] = v, i
+			fill[w] += 1
+		return offsets, targets, edge_of
+
+	def has_path(self):
+		"""Return True if the graph has an Eulerian path"""
+		return self._path is not None
+
+	def is_circuit(self):
+		"""Return True if the Eulerian path is a circuit"""
+		return self._path is not None and self.circuit
+
+	def path(self):
+		"""Return vertices of the Eulerian path in order (None if none)"""
+		return self._path
@@ -553,9 +553,13 @@ class UnionFind:
         self.rank = [1] * N          # size of subtree
 
     def find(self, p: int, halving: bool=True) -> int:
-        if p != self.parent[p]:
-            self.parent[p] = self.find(self.parent[p]) # path compression
-        return self.parent[p]
+        """Find with path halving (or path splitting if not halving)."""
+        parent = self.parent
+        while p != parent[p]: 
+            q = parent[p]
+            parent[p] = parent[q] # point p to its grandparent
+            p = parent[p] if halving else q # halving skips q, splitting visits it
+        return p
 
     def union(self, p: int, q: int, ranking: bool=True) -> bool:
         prt, qrt = self.find(p), self.find(q)
@@ -585,49 +589,63 @@ def tpsort(graph, indeg):
 
 
 def tpsort(graph):
-    """Topological sort for digraph via tri-color encoding."""
-        
-    def dfs(n):
-        """Return True if a cycle is detected."""
-        if visited[n]: return visited[n] == -1
-        visited[n] = -1 # GRAY (temporary mark)
-        for nn in digraph.get(n, []):
-            if visited[nn] != 1 and dfs(nn): return True 
-        ans.append(n)
-        visited[n] = 1 # BLACK (permanent mark)
-        return False 
-    
+    """Topological sort for digraph via tri-color encoding (explicit stack)."""
     ans = []
     visited = [0]*len(graph) # WHITE
     for n in range(len(graph)): 
-        if dfs(n): return [] 
+        if visited[n]: continue 
+        visited[n] = -1 # GRAY (temporary mark)
+        stack = [(n, iter(graph.get(n, [])))]
+        while stack: 
+            n, it = stack[-1]
+            for nn in it: 
+                if visited[nn] == -1: return [] # cycle detected 
+                if visited[nn] == 0: 
+                    visited[nn] = -1 
+                    stack.append((nn, iter(graph.get(nn, []))))
+                    break 
+            else: 
+                stack.pop()
+                ans.append(n)
+                visited[n] = 1 # BLACK (permanent mark)
     ans.reverse()
     return ans 
 
 
 def tarjan(n: int, connections: List[List[int]]) -> List[List[int]]:
-    """Tarjan's algo to find bridges (critical edges) in a graph."""
-    graph = {} # graph as adjacency list 
-    for u, v in connections: 
-        graph.setdefault(u, []).append(v)
-        graph.setdefault(v, []).append(u)
+    """Tarjan's algo to find bridges (critical edges) in a graph.
     
-    def dfs(x, p, step): 
-        """Traverse the graph and collect bridges using Tarjan's algo."""
-        disc[x] = low[x] = step
-        for xx in graph.get(x, []): 
-            if disc[xx] == inf: 
-                step += 1
-                dfs(xx, x, step)
-                low[x] = min(low[x], low[xx])
-                if low[xx] > disc[x]: ans.append([x, xx]) # bridge
-            elif xx != p: low[x] = min(low[x], disc[xx])
+    Searches from every undiscovered vertex (all components) and skips only 
+    the edge it came by, so parallel edges are never bridges. For big graphs
+    see graph.Biconnected (CSR, also articulation points and components)."""
+    graph = [[] for _ in range(n)] # graph as adjacency list of (node, edge id)
+    for i, (u, v) in enumerate(connections): 
+        graph[u].append((v, i))
+        graph[v].append((u, i))
     
     ans = []
     low = [inf]*n
     disc = [inf]*n
-    
-    dfs(0, -1, 0)
+    step = 0 
+    for root in range(n): 
+        if disc[root] != inf: continue 
+        disc[root] = low[root] = step
+        step += 1
+        stack = [(root, -1, -1, iter(graph[root]))] # explicit stack instead of recursion
+        while stack: 
+            x, p, pe, it = stack[-1]
+            for xx, e in it: 
+                if disc[xx] == inf: 
+                    disc[xx] = low[xx] = step
+                    step += 1
+                    stack.append((xx, x, e, iter(graph[xx])))
+                    break 
+                elif e != pe: low[x] = min(low[x], disc[xx])
+            else: # x is done, report back to its parent 
+                stack.pop()
+                if p != -1: 
+                    low[p] = min(low[p], low[x])
+                    if low[x] > disc[p]: ans.append([p, x]) # bridge
     return ans 
 
 
@@ -635,7 +653,7 @@ def hasEulerianPath(graph):
     """Return True if given graph has an Eulerian path."""
     indeg = [0]*len(graph)
     outdeg = [0]*len(graph)
-    for u, nodes in graph: 
+    for u, nodes in enumerate(graph): 
         outdeg[u] = len(nodes)
         for v in nodes: indeg[v] += 1
     start = end = 0 
@@ -646,15 +664,17 @@ def hasEulerianPath(graph):
     return start == end == 0 or start == end == 1
 
 
-def hierholzer(graph):
-    """Return an Eulerian path via Hierholzer algo"""
+def hierholzer(graph, start=0):
+    """Return an Eulerian path via Hierholzer algo (explicit stack)"""
     ans = []
-
-    def fn(x): 
-        """Return Eulerian path via dfs."""
-        while graph[x]: fn(graph[x].pop()) 
-        ans.append(x)
-
+    cursor = [0]*len(graph) # next unused edge per node (graph is not mutated)
+    stack = [start]
+    while stack: 
+        x = stack[-1]
+        if cursor[x] < len(graph[x]): 
+            stack.append(graph[x][cursor[x]])
+            cursor[x] += 1
+        else: ans.append(stack.pop())
     ans.reverse()
     return ans 
 
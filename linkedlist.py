@@ -162,8 +162,8 @@ class Stack:
 		self._size += 1
 
 
-class Quque:
-    """A queue object is an ordered collection of elements, which can be added
+class Queue:
+	"""A queue object is an ordered collection of elements, which can be added
 	at rear, and removed at front. Queue operations include:
 	1) enqueuing an item onto the rear of the queue, 
 	2) dequeuing an item from the front of the queue, 
@@ -213,7 +213,8 @@ class Quque:
 		self._size -= 1
 		if len(self) == 0:
 		#edge case - last node
-			self._tail = None
+			self._rear = None
+		return item
 
 	def enqueue(self, item):
 		"""Enqueue an item from the rear of the queue ~ O(1)"""
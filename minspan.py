@@ -73,19 +73,31 @@ class Edge:
 """
 Edge-weighted graph -- adjacency-lists representation 
 Maintain a vertex-indexed array of edge list
+
+For large graphs, freeze it into compressed sparse row arrays (module "csr");
+every algorithm below converts its input with as_csr() and runs on the arrays. 
 """
+from linkedlist import Bag, Stack
+from csr import CSRGraph, as_csr
+
 class EdgeWeightedGraph:
 	def __init__(self, V):
 		"""Initialize an empty graph with given vertices"""
 		self._V = V
-		self._adj = [Bag()] * V
+		self._E = 0
+		self._adj = [Bag() for _ in range(V)]
+
+	def __len__(self):
+		"""Return number of vertices"""
+		return self._V
 
 	def add_edge(self, edge):
 		"""Add weighted edge to graph"""
 		v = edge.either()
 		w = edge.other(v)
-		self._adj[v].append(edge)
-		self._adj[w].append(edge)
+		self._adj[v].add(edge)
+		self._adj[w].add(edge)
+		self._E += 1
 
 	def adj(self, vertex):
 		"""Returns edges incident to given vertex"""
@@ -93,56 +105,106 @@ class EdgeWeightedGraph:
 
 	def edges(self):
 		"""Return all edges in the graph"""
-		pass
+		ans = []
+		for v in range(self._V):
+			loops = 0
+			for edge in self._adj[v]:
+				w = edge.other(v)
+				if v < w: ans.append(edge)
+				elif v == w: #self-loop appears twice in v's list
+					if loops % 2 == 0: ans.append(edge)
+					loops += 1
+		return ans
 
 	def V(self):
 		"""Return number of vertices"""
-		pass
+		return self._V
 
 	def E(self):
 		"""Return number of edges"""
-		pass
+		return self._E
+
+	def to_csr(self):
+		"""Return a frozen compressed sparse row copy of the graph"""
+		return as_csr(self)
 
 	def __str__(self):
 		"""Return string representation of graph"""
-		pass
+		ans = f"{self._V} {self._E}\n"
+		for v in range(self._V):
+			ans += f"{v}: " + "  ".join(map(str, self._adj[v])) + "\n"
+		return ans
 
 class MST:
-	def __init__(self, graph):
-		
+	"""Minimum spanning tree (forest if graph is not connected)
+
+	MST(graph, method) runs one of the engines below, i.e.
+	* "kruskal"   -- sort edges, ~ Elog(E) time, E extra space;
+	* "lazy_prim" -- priority queue of edges, ~ Elog(E) time, E extra space;
+	* "prim"      -- indexed priority queue of vertices, ~ Elog(V) time, V extra space;
+	* "boruvka"   -- log(V) rounds of cheapest edge per component (parallel).
+	Engines pass method=None and fill in self.mst themselves. 
+	"""
+	engines = {} #method -> engine class (registered below)
+
+	def __init__(self, graph, method="prim", **options):
 		self.graph = graph
+		self.mst = Queue() #mst -- a queue of edges 
+		self._weight = None
+		if method is not None: 
+			if method not in MST.engines: 
+				raise ValueError(f"Unknown MST method {method!r}")
+			engine = MST.engines[method](graph, **options)
+			self.mst, self._weight = engine.mst, engine.weight()
 	
 	def edges(self):
 		"""Return edges in MST"""
-		pass
+		return self.mst
 
 	def weight(self):
 		"""Return weight of MST"""
-		pass
+		if self._weight is None: 
+			self._weight = sum(edge.weight() for edge in self.mst)
+		return self._weight
 
 #Kruskal's algorithm (1956)
 #Consider edges in ascending order of weight, and add next edge to tree unless 
 #doing so would create a cycle.
 
-from containers import Queue, UnionFind
-from tree import MinQueue
+from containers import Queue
+from unionfind import UnionFind
+
+class Kruskal(MST):
+	"""Kruskal's algorithm for minimum spanning tree
 
-class Kruskal:
-	"""Kruskal's algorithm for minimum spanning tree"""
-	mst = Queue() #mst -- a queue of edges 
+	Edges are kept as parallel (src, dst, weight) arrays and sorted once by an 
+	argsort of the weight array (timsort over edge indices keyed by weight), 
+	instead of inserting Edge objects into a priority queue. The scan stops 
+	as soon as the tree has V-1 edges. 
+	"""
 	def __init__(self, graph):
 		"""Kruskal's algorithm computes MST in time proportional to Elog(E)"""
-		pq = MinQueue()
-		for edge in graph.edges(): #build prioirty queue ~ O(E)
-			pq.insert(edge)
+		super().__init__(graph, None)
+		graph = as_csr(graph)
+		src, dst, wt = graph.edge_arrays()
 		uf = UnionFind(len(graph))
-		while pq and len(mst) < len(graph) - 1:	
-			edge = pq.del_min() #delete-min ~ O(log(E))
+		self._weight = 0.0
+		for e in sorted(range(len(wt)), key=wt.__getitem__): #argsort ~ O(Elog(E))
+			if uf.count <= 1: break #V-1 edges taken
+			if uf.union(src[e], dst[e]): #union ~ O(log*(V))
+				self.mst.enqueue(Edge(src[e], dst[e], wt[e]))
+				self._weight += wt[e]
+
+	def clusters(self, k):
+		"""Return single-link k-clustering as a cluster label per vertex, i.e.
+		replay the MST edges (ascending weight) until k clusters remain"""
+		uf = UnionFind(len(self.graph))
+		for edge in self.mst: 
+			if uf.count <= k: break 
 			v = edge.either()
-			w = edge.other(v)
-			if not uf.connectged(v, w): #connected ~ O(log*(V))
-				uf.union(v, w) #union ~ O(log*(V))
-				mst.enqueue(edge)
+			uf.union(v, edge.other(v))
+		label = {}
+		return [label.setdefault(uf.find(v), len(label)) for v in range(len(uf))]
 
 #Prim's algorithm (Jarnik 1930, Dijkstra 1957, Prim 1959)
 #Start with vertex 0 and greedily grow tree by adding the shortest edge 
@@ -156,8 +218,7 @@ class Kruskal:
 # - add to priority queue any edge incident to w (assuming other endpoint not on tree)
 # - add w to tree 
 
-from tree import MinQueue
-from containers import Queue
+from heapq import heapify, heappush, heappop
 
 """
 ------------------------------------
@@ -167,29 +228,29 @@ delete min | E         | log(E)
 ------------------------------------    
 """
 
-class Prim:
+class Prim(MST):
 	"""Lazy implementation of Prim algorithm"""
 	def __init__(self, graph):
-		self.pq = MinQueue() #priority queue of edges
-		self.mst = Queue()   #MST edges
+		super().__init__(graph, None)
+		graph = as_csr(graph)
+		self.pq = [] #priority queue of (weight, arc, tail) 
 		self.marked = [False] * len(graph) #MST vertices
-		self.visit(graph, 0) #assuming graph is connected
-
-		while self.pq:
-			edge = self.pq.del_min() #repeatedly delete min edge from pq
-			v = edge.either()
-			w = edge.other(v)
-			if self.marked[v] and self.marked[w]: continue #ignore if both endpoints on tree
-			self.mst.enqueue(edge)
-			if not self.marked[v]: self.visit(graph, v) #add v to tree
-			if not self.marked[w]: self.visit(graph, w) #add w to tree
+		for s in range(len(graph)): #one tree per connected component
+			if self.marked[s]: continue
+			self.visit(graph, s)
+			while self.pq:
+				weight, e, v = heappop(self.pq) #repeatedly delete min edge from pq
+				w = graph.targets[e]
+				if self.marked[w]: continue #ignore if both endpoints on tree
+				self.mst.enqueue(Edge(v, w, weight))
+				self.visit(graph, w) #add w to tree
 
 	def visit(self, graph, v):
 		"""put vertex on the tree and its incident edges on priority queue"""
 		self.marked[v] = True #add vertex to tree
-		for edge in graph.adj(v):
-			if not self.marked[edge.other(v)]:
-				self.pq.insert(edge) #add w to pq if not in tree
+		for e in graph.arcs(v):
+			if not self.marked[graph.targets[e]]:
+				heappush(self.pq, (graph.weight(e), e, v)) #add w to pq if not in tree
 
 
 """Eager implementation
@@ -209,36 +270,162 @@ Associate an index between 0 and N-1 with each key in a proirity queue
 - client can insert and delete-the-minimum;
 - client can change the key by specifying the index.
 """
+from array import array
+
 class IndexMinPQ:
-	"""Associate an index between 0 and N-1 with each key in a priority queue"""
-	def __init__(self, N):
+	"""Associate an index between 0 and N-1 with each key in a priority queue
+
+	The heap is d-ary (d = 2, 4 or 8) and lives in flat typed arrays instead 
+	of a list of objects, so each entry costs 24 bytes regardless of N. 
+	"""
+	def __init__(self, N, d=2):
 		"""Create indexed priority with indices 0, 1, ..., N-1
 		maintain parallel arrays keys[i], pq[i] and qp[i] so that 
 		- keys[i] is the priority of i
 		- pq[i] is the index of the key in heap position i
-		- qp[i] is the heap position of the key with index i
+		- qp[i] is the heap position of the key with index i (-1 if absent)
 		"""
+		if d not in (2, 4, 8): 
+			raise ValueError("Fan-out must be 2, 4 or 8")
 		self.N = N
+		self.d = d 
+		self.n = 0 #number of entries on heap
+		self.keys = array("d", [0.0]) * N
+		self.pq = array("l", [0]) * N
+		self.qp = array("l", [-1]) * N
+
+	def _swim(self, k):
+		"""Swim up heap position k until heap order is restored (moving a 
+		hole instead of swapping)"""
+		keys, pq, qp, d = self.keys, self.pq, self.qp, self.d
+		i = pq[k]
+		key = keys[i]
+		while k:
+			p = (k-1)//d #parent of k
+			j = pq[p]
+			if keys[j] <= key: break
+			pq[k] = j
+			qp[j] = k
+			k = p
+		pq[k] = i
+		qp[i] = k
+
+	def _sink(self, k):
+		"""Sink down heap position k until heap order is restored"""
+		keys, pq, qp, d, n = self.keys, self.pq, self.qp, self.d, self.n
+		i = pq[k]
+		key = keys[i]
+		while True: 
+			c = d*k + 1 #first child of k
+			if c >= n: break
+			best, low = c, keys[pq[c]]
+			for cc in range(c+1, min(c+d, n)): #smallest of (up to) d children
+				kk = keys[pq[cc]]
+				if kk < low: best, low = cc, kk
+			if key <= low: break
+			j = pq[best]
+			pq[k] = j
+			qp[j] = k
+			k = best
+		pq[k] = i
+		qp[i] = k
+
+	def _check(self, i):
+		"""Validate index i"""
+		if not 0 <= i < self.N: 
+			raise IndexError(f"Index {i} out of range")
 
 	def insert(self, i, key):
-		"""Associate key with index i"""
-		pass
+		"""Associate key with index i ~ O(log_d(N))"""
+		self._check(i)
+		if self.qp[i] != -1: 
+			raise ValueError(f"Index {i} is already in the priority queue")
+		self.keys[i] = key
+		self.pq[self.n] = i 
+		self.qp[i] = self.n
+		self.n += 1
+		self._swim(self.n - 1)
 
 	def decrease_key(self, i, key):
-		"""Decrease the key associated with index i"""
-		pass
+		"""Decrease the key associated with index i ~ O(log_d(N))"""
+		if i not in self: 
+			raise ValueError(f"Index {i} is not in the priority queue")
+		if key > self.keys[i]: 
+			raise ValueError("Key would not be decreased")
+		self.keys[i] = key 
+		self._swim(self.qp[i])
+
+	def increase_key(self, i, key):
+		"""Increase the key associated with index i ~ O(d*log_d(N))"""
+		if i not in self: 
+			raise ValueError(f"Index {i} is not in the priority queue")
+		if key < self.keys[i]: 
+			raise ValueError("Key would not be increased")
+		self.keys[i] = key 
+		self._sink(self.qp[i])
+
+	def change_key(self, i, key):
+		"""Change the key associated with index i in either direction"""
+		if i not in self: 
+			raise ValueError(f"Index {i} is not in the priority queue")
+		self.keys[i] = key 
+		self._swim(self.qp[i])
+		self._sink(self.qp[i])
+
+	def delete(self, i):
+		"""Remove index i and its associated key ~ O(d*log_d(N))"""
+		if i not in self: 
+			raise ValueError(f"Index {i} is not in the priority queue")
+		k = self.qp[i]
+		self.n -= 1
+		self.qp[i] = -1
+		if k < self.n: #move last entry into the hole
+			j = self.pq[self.n]
+			self.pq[k] = j
+			self.qp[j] = k
+			self._swim(k)
+			self._sink(self.qp[j])
 
 	def __contains__(self, i):
 		"""Return True if index i is in the queue"""
-		pass
+		return 0 <= i < self.N and self.qp[i] != -1
+
+	def key_of(self, i):
+		"""Return the key associated with index i"""
+		if i not in self: 
+			raise ValueError(f"Index {i} is not in the priority queue")
+		return self.keys[i]
+
+	def min_index(self):
+		"""Return an index associated with a minimal key"""
+		if not self.n: raise Exception("Priority queue underflow")
+		return self.pq[0]
+
+	def min_key(self):
+		"""Return a minimal key"""
+		if not self.n: raise Exception("Priority queue underflow")
+		return self.keys[self.pq[0]]
 
 	def del_min(self):
-		"""Remove a minimal key and return its associated index"""
-		pass
+		"""Remove a minimal key and return its associated index ~ O(d*log_d(N))"""
+		if not self.n: raise Exception("Priority queue underflow")
+		i = self.pq[0]
+		self.n -= 1
+		self.qp[i] = -1
+		if self.n: 
+			self.pq[0] = self.pq[self.n]
+			self.qp[self.pq[0]] = 0
+			self._sink(0)
+		return i 
 
 	def __len__(self):
 		"""Return number of entries in the priority queue"""
-		pass
+		return self.n
+
+	def clear(self):
+		"""Remove all entries ~ O(n) in the number of entries (not N)"""
+		for k in range(self.n): self.qp[self.pq[k]] = -1
+		self.n = 0
 
 """
 ---------------------------------------------------------------------
@@ -256,6 +443,120 @@ Bottom line:
 * fibonacci heap best in theory, but not worth implementing. 
 """
 
+class EagerPrim(MST):
+	"""Eager implementation of Prim algorithm (priority queue of V vertices)"""
+	def __init__(self, graph, d=4):
+		super().__init__(graph, None)
+		graph = as_csr(graph)
+		V = len(graph)
+		offsets, targets = graph.offsets, graph.targets
+		edge_from = array("l", [-1]) * V #tree vertex of shortest edge to v
+		dist_to = array("d", [float("inf")]) * V #weight of that edge
+		marked = bytearray(V)
+		pq = IndexMinPQ(V, d)
+		for s in range(V): #one tree per connected component
+			if marked[s]: continue 
+			dist_to[s] = 0.0
+			pq.insert(s, 0.0)
+			while pq:
+				v = pq.del_min()
+				marked[v] = True
+				if edge_from[v] != -1: 
+					self.mst.enqueue(Edge(edge_from[v], v, dist_to[v]))
+				for e in range(offsets[v], offsets[v+1]):
+					w = targets[e]
+					if marked[w]: continue 
+					weight = graph.weight(e)
+					if weight < dist_to[w]: #better edge to w
+						dist_to[w] = weight 
+						edge_from[w] = v
+						if w in pq: pq.decrease_key(w, weight)
+						else: pq.insert(w, weight)
+
+
+"""Boruvka's algorithm (1926)
+Repeat until no edge crosses two components:
+1) for each component, find the cheapest edge leaving it;
+2) add all these edges to the MST (ties broken by edge index to avoid cycles).
+Each round at least halves the number of components, so there are at most 
+log(V) rounds of ~ E work each. The cheapest-edge pass is a pure scan over 
+the edge arrays with component labels, so it splits across worker processes
+(edge ranges), with the arrays handed over in shared memory. 
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from csr import share, attach
+
+def _cheapest(src, dst, wt, comp, lo, hi):
+	"""Return {component: cheapest edge leaving it} over edges lo..hi-1"""
+	best = {}
+	for e in range(lo, hi):
+		a, b = comp[src[e]], comp[dst[e]]
+		if a == b: continue 
+		for c in (a, b):
+			f = best.get(c)
+			if f is None or wt[e] < wt[f] or wt[e] == wt[f] and e < f: best[c] = e
+	return best
+
+def _cheapest_worker(specs, lo, hi):
+	"""Worker -- attach shared (src, dst, wt, comp) arrays and run _cheapest"""
+	blocks, views = zip(*(attach(*spec) for spec in specs))
+	try: 
+		best = _cheapest(*views, lo, hi)
+	finally: 
+		for view in views: view.release()
+		for shm in blocks: shm.close()
+	return array("l", [x for item in best.items() for x in item]).tobytes()
+
+
+class Boruvka(MST):
+	"""Boruvka's algorithm for minimum spanning tree"""
+	def __init__(self, graph, workers=None):
+		super().__init__(graph, None)
+		graph = as_csr(graph)
+		V = len(graph)
+		src, dst, wt = graph.edge_arrays()
+		E = len(wt)
+		uf = UnionFind(V)
+		comp = array("l", range(V)) #component label of each vertex
+		pool, blocks, labels = None, [], None
+		try: 
+			if workers and workers > 1 and E: #created inside try, so a partial setup is cleaned up
+				for data in (src, dst, wt, comp): blocks.append(share(data))
+				specs = [(shm.name, data.typecode, len(data)) for shm, data in zip(blocks, (src, dst, wt, comp))]
+				labels = blocks[3].buf[:V*comp.itemsize].cast(comp.typecode)
+				pool = ProcessPoolExecutor(workers)
+			while True: 
+				if pool is None: 
+					best = _cheapest(src, dst, wt, comp, 0, E)
+				else: 
+					best = {}
+					cuts = [E*i//workers for i in range(workers+1)]
+					futures = [pool.submit(_cheapest_worker, specs, lo, hi) 
+					           for lo, hi in zip(cuts, cuts[1:]) if lo < hi]
+					for future in futures: #merge partial minima
+						pairs = array("l")
+						pairs.frombytes(future.result())
+						for i in range(0, len(pairs), 2): 
+							c, e = pairs[i], pairs[i+1]
+							f = best.get(c)
+							if f is None or wt[e] < wt[f] or wt[e] == wt[f] and e < f: best[c] = e
+				if not best: break 
+				for e in sorted(set(best.values())): 
+					if uf.union(src[e], dst[e]): 
+						self.mst.enqueue(Edge(src[e], dst[e], wt[e]))
+				for v in range(V): comp[v] = uf.find(v)
+				if pool is not None: labels[:] = comp
+		finally: 
+			if pool is not None: pool.shutdown()
+			if labels is not None: labels.release()
+			for shm in blocks: 
+				shm.close()
+				shm.unlink()
+
+
+MST.engines.update(kruskal=Kruskal, lazy_prim=Prim, prim=EagerPrim, boruvka=Boruvka)
+
 """
 Linear-time MST?
 -------------------------------------------------------
@@ -305,7 +606,7 @@ class DirectredEdge:
 		"""Weighted edge v->w"""
 		self.v = v
 		self.w = w
-		self.weight = weight
+		self._weight = weight
 
 	def from_(self):
 		"""vertex v"""
@@ -317,64 +618,93 @@ class DirectredEdge:
 
 	def weight(self):
 		"""Weight"""
-		return self.weight
+		return self._weight
 
 	def __str__(self):
-		return f"{self.from_} -> {self.to}, {self.weight}"
+		return f"{self.v} -> {self.w}, {self._weight}"
 
 
 class EdgeWeightedDigraph:
 	"""edge weighted digraph represented by adjacency-list"""
+	directed = True
+
 	def __init__(self, V):
 		"""Edge weighted digraph with V vertices"""
-		self.V = V
-		self.adj[v] = [Bag() for _ in range(V)]
+		self._V = V
+		self._E = 0
+		self._adj = [Bag() for _ in range(V)]
+
+	def __len__(self):
+		"""Return number of vertices"""
+		return self._V
 
 	def add_edge(self, edge):
 		"""Add weighed directed edge"""
 		v = edge.from_()
-		self.adj[v].add(edge)
+		self._adj[v].add(edge) #add edge v->w to only v's adjacency list
+		self._E += 1
 
 	def adj(self, v):
 		"""Return edges pointing from v"""
-		return self.adj[v] #add edge v->w to only v's adjacency list
+		return self._adj[v]
 
 	def V(self):
 		"""Return number of vertices"""
-		pass 
+		return self._V
 
 	def E(self):
 		"""Return number of edges"""
-		pass
+		return self._E
 
 	def edges(self):
 		"""Return all edges"""
-		pass
+		return [edge for v in range(self._V) for edge in self._adj[v]]
+
+	def to_csr(self):
+		"""Return a frozen compressed sparse row copy of the digraph"""
+		return as_csr(self)
 		
 	def __str__(self):
 		"""Return string representation"""
-		pass 
+		ans = f"{self._V} {self._E}\n"
+		for v in range(self._V):
+			ans += f"{v}: " + "  ".join(map(str, self._adj[v])) + "\n"
+		return ans
 
 
 class ShortestPath:
-	"""Shortest path from source s in graph"""
+	"""Shortest path from source s in graph
+
+	The SPT lives in two vertex-indexed typed arrays over the CSR form of the 
+	graph, i.e. _dist_to[v] and _edge_to[v] (arc index of last edge, -1 if none).
+	"""
 	def __init__(self, graph, s):
-		self.graph = graph
+		self.graph = as_csr(graph)
 		self.s = s
+		self._dist_to = array("d", [float("inf")]) * len(self.graph)
+		self._edge_to = array("l", [-1]) * len(self.graph)
+		if s is not None: self._dist_to[s] = 0.0
 		
 	def dist_to(self, v):
-		return self.dist_to[v]
+		return self._dist_to[v]
+
+	def edge_to(self, v):
+		"""Return last edge on shortest path from s to v"""
+		e = self._edge_to[v]
+		if e == -1: return None
+		return DirectredEdge(self.graph.tail(e), v, self.graph.weight(e))
 
 	def path_to(self, v):
+		if not self.has_path_to(v): return None
 		path = Stack()
-		edge = self.edge_to[v]
+		edge = self.edge_to(v)
 		while edge:
 			path.push(edge)
-			edge = self.edge_to[edge.from_()]
+			edge = self.edge_to(edge.from_())
 		return path 
 
 	def has_path_to(self, v):
-		pass
+		return self._dist_to[v] < float("inf")
 
 	def has_negcycle(self):
 		pass
@@ -384,11 +714,11 @@ class ShortestPath:
 
 
 #client 
-sp = ShortestPath(graph, source)
-for v in range(graph.V()):
-	print(f"{s} to {v}  ({sp.dist_to(v)})")
-	for edge in sp.path_to(v):
-		print(edge, end=" ")
+#sp = ShortestPath(graph, source)
+#for v in range(graph.V()):
+#	print(f"{s} to {v}  ({sp.dist_to(v)})")
+#	for edge in sp.path_to(v):
+#		print(edge, end=" ")
 
 """Edge relaxation
 relax edge e=v->w
@@ -426,47 +756,239 @@ DIJKSTRA'S ALGORITHM
 Dijkstra's algorithm computes a SPT in any edge-weighted digraph with nonnegative weights. 
 """
 
-class DijkstraSP:
-	"""Dijkstra's short-paths algorithm"""
-	def __init__(self, digraph, source):
-		self.edge_to = [None] * digraph.V()
-		self.dist_to = [float("inf")] * digraph.V()
-		pq = IndexMinPQ(digraph.V())
-
-		self.dist_to[source] = 0
-
-		pq.insert(source, 0.0)
-		while pq:
+class DijkstraSP(ShortestPath):
+	"""Dijkstra's short-paths algorithm
+
+	With a source, compute the whole SPT up front. Without one, answer 
+	point-to-point queries via query(s, t), which stops as soon as t is 
+	settled and afterwards resets only the vertices it touched. 
+	"""
+	def __init__(self, digraph, source=None, d=4):
+		super().__init__(digraph, source)
+		self.pq = IndexMinPQ(len(self.graph), d)
+		self._touched = array("l") #vertices with finite dist_to
+		self._lm_from = self._lm_to = () #landmark distances (ALT)
+		if source is None: return 
+		self.pq.insert(source, 0.0)
+		while self.pq:
+			v = self.pq.del_min()
+			self._touched.append(v) #so a later query() resets the SPT
+			for e in self.graph.arcs(v):
+				self.relax(v, e)
+
+	def relax(self, v, e):
+		"""Relax arc e=v->w"""
+		w = self.graph.targets[e]
+		dist = self._dist_to[v] + self.graph.weight(e)
+		if self._dist_to[w] > dist:
+			self._dist_to[w] = dist
+			self._edge_to[w] = e 
+			if w in self.pq: self.pq.decrease_key(w, dist)
+			else: self.pq.insert(w, dist)
+
+	def query(self, s, t, heuristic=None):
+		"""Return length of shortest path s->t (inf if none); path_to(t) then 
+		gives its edges. heuristic(v, t) turns the search into A*, it must be a
+		consistent lower bound on dist(v, t); "alt" uses the landmarks."""
+		if heuristic == "alt": 
+			if not self._lm_from: raise ValueError("Call landmarks() before ALT queries")
+			heuristic = self._alt
+		dist_to, edge_to, touched = self._dist_to, self._edge_to, self._touched
+		for v in touched: #undo previous query
+			dist_to[v] = float("inf")
+			edge_to[v] = -1
+		del touched[:]
+		offsets, targets, pq = self.graph.offsets, self.graph.targets, self.pq
+		self.s = s
+		dist_to[s] = 0.0
+		touched.append(s)
+		pq.insert(s, heuristic(s, t) if heuristic else 0.0)
+		while pq: 
 			v = pq.del_min()
-			for edge in digraph.adj(v):
-				self.relax(edge)
-
-	def relax(self, edge):
-		v = e.from_()
-		w = e.to()
-		if self.dist_to[w] > self.dist_to[v] + edge.weight():
-			self.dist_to[w] = dist_to[v] + edge.weight()
-			self.edge_to[w] = edge 
-			if w in self.pq: self.pq.decrease_key(w, self.dist_to[w])
-			else: self.pq.insert(w, self.dist_to[w])
+			if v == t: break #t settled
+			for e in range(offsets[v], offsets[v+1]):
+				w = targets[e]
+				dist = dist_to[v] + self.graph.weight(e)
+				if dist < dist_to[w]: 
+					if dist_to[w] == float("inf"): touched.append(w)
+					dist_to[w] = dist
+					edge_to[w] = e
+					key = dist + heuristic(w, t) if heuristic else dist
+					if w in pq: pq.decrease_key(w, key)
+					else: pq.insert(w, key)
+		pq.clear()
+		return dist_to[t]
+
+	def landmarks(self, k=None, chosen=None):
+		"""Precompute distances from and to k landmarks for ALT queries 
+
+		The chosen landmarks come first, and farthest-point selection adds the 
+		rest up to k (default len(chosen), or 8 if none are chosen), i.e. each 
+		next landmark is the reachable vertex farthest from those so far. 
+		By the triangle inequality, for every landmark L
+		  dist(v, t) >= dist(L, t) - dist(L, v) and dist(v, t) >= dist(v, L) - dist(t, L)
+		"""
+		V = len(self.graph)
+		reverse = self.graph.reverse()
+		inf = float("inf")
+		chosen = list(chosen) if chosen is not None else []
+		picks = list(chosen) or ([0] if V else []) #a copy, it is consumed
+		count = k if k is not None else len(chosen) or 8
+		self._lm_from, self._lm_to = [], []
+		nearest = array("d", [inf]) * V #distance to the closest landmark 
+		while picks and len(self._lm_from) < count: 
+			L = picks.pop(0)
+			forward = DijkstraSP(self.graph, L)._dist_to
+			self._lm_from.append(forward)
+			self._lm_to.append(DijkstraSP(reverse, L)._dist_to)
+			for v in range(V): 
+				if forward[v] < nearest[v]: nearest[v] = forward[v]
+			if not picks: 
+				far = max(range(V), key=lambda v: nearest[v] if nearest[v] < inf else -1)
+				if nearest[far] == 0: #all reached vertices taken, jump elsewhere
+					far = next((v for v in range(V) if nearest[v] == inf), None)
+				if far is not None: picks.append(far)
+		return self
+
+	def _alt(self, v, t):
+		"""ALT lower bound on dist(v, t)"""
+		inf, best = float("inf"), 0.0
+		for fwd, bwd in zip(self._lm_from, self._lm_to):
+			if fwd[t] < inf and fwd[v] < inf and fwd[t] - fwd[v] > best: best = fwd[t] - fwd[v]
+			if bwd[v] < inf and bwd[t] < inf and bwd[v] - bwd[t] > best: best = bwd[v] - bwd[t]
+		return best 
 
 """Acyclic shortest-paths (DAG)
 1) consider vertices in topological order;
 2) relax all edges pointing from that vertex. 
+
+Each vertex is relaxed once after all of its predecessors, so this takes 
+O(V+E) time, allows negative weights, and flipping the comparison (start 
+at -infinity, keep the larger distance) gives longest paths. The order comes
+from Kahn's algorithm (peel off vertices of in-degree 0) and depends only on 
+the structure of the DAG, so it is kept and reused when only weights change.
 """
 
-class AcyclicSP:
-	"""Compute shortest paths in edge-weighted DAG"""
-	def __init__(self, digraph, source):
-		self.edge_to = [None] * len(digraph)
-		self.dist_to = [float("inf")] * len(digraph)
+def kahn_order(digraph):
+	"""Return a topological order (array) of given digraph via Kahn's 
+	algorithm ~ O(V+E); raise ValueError if it has a directed cycle"""
+	graph = as_csr(digraph)
+	offsets, targets = graph.offsets, graph.targets
+	indeg = array("l", [0]) * len(graph)
+	for w in targets: indeg[w] += 1
+	stack = array("l", (v for v in range(len(graph)) if indeg[v] == 0))
+	order = array("l")
+	while stack: 
+		v = stack.pop()
+		order.append(v)
+		for e in range(offsets[v], offsets[v+1]):
+			w = targets[e]
+			indeg[w] -= 1
+			if indeg[w] == 0: stack.append(w)
+	if len(order) != len(graph): raise ValueError("Digraph has a directed cycle")
+	return order
+
+
+class AcyclicSP(ShortestPath):
+	"""Shortest (or longest) paths from source in an edge-weighted DAG"""
+	def __init__(self, digraph, source, longest=False, order=None):
+		"""order -- a cached topological order (e.g. from a previous run)"""
+		super().__init__(digraph, source)
+		self.longest = longest
+		self.order = kahn_order(self.graph) if order is None else order
+		self.run()
+
+	def run(self, weights=None):
+		"""(Re)compute all paths over the cached topological order ~ O(V+E), 
+		optionally with new arc weights (parallel to graph.targets)"""
+		graph = self.graph
+		if weights is not None: 
+			if len(weights) != len(graph.targets): raise ValueError("Weights must be parallel to targets")
+			graph = self.graph = CSRGraph(len(graph), graph.offsets, graph.targets, weights, True)
+		sign = -1.0 if self.longest else 1.0 #longest paths are shortest in -weights
+		dist_to, edge_to = self._dist_to, self._edge_to
+		for v in range(len(graph)): 
+			dist_to[v] = float("inf")
+			edge_to[v] = -1
+		dist_to[self.s] = 0.0
+		offsets, targets = graph.offsets, graph.targets
+		for v in self.order: 
+			if dist_to[v] == float("inf"): continue #not reachable from source
+			for e in range(offsets[v], offsets[v+1]):
+				w = targets[e]
+				dist = dist_to[v] + sign*graph.weight(e)
+				if dist < dist_to[w]: 
+					dist_to[w] = dist
+					edge_to[w] = e
+		if self.longest: 
+			for v in range(len(graph)): dist_to[v] = 0.0 - dist_to[v] #unreachable becomes -inf
+		return self
+
+	def has_path_to(self, v):
+		return abs(self._dist_to[v]) < float("inf")
+
+
+"""CPM -- critical path method
+Parallel job scheduling: given jobs with durations and precedence constraints
+(job i must finish before job j begins), find the earliest start times on 
+unlimited processors. Build a DAG with a source s, a sink t, and two vertices
+per job (start i and end i+N): 
+* job edge i -> i+N weighted by duration;
+* 0-weight edges s -> i and i+N -> t; 
+* 0-weight edge i+N -> j for each constraint "i before j". 
+The earliest start of job i is the longest path from s to i, the makespan is
+the longest path to t, and that path is the critical path. 
+"""
 
-		topological = Topological(digraph)
-		for v in topological.order():
-			for edge in digraph.adj[v]:
-				self.relax(edge)
+class CPM:
+	"""Critical path method for parallel precedence-constrained scheduling"""
+	def __init__(self, durations, precedences=()):
+		"""durations[i] -- duration of job i; precedences -- pairs (i, j) 
+		meaning job i must finish before job j starts"""
+		N = self.N = len(durations)
+		s, t = 2*N, 2*N+1
+		src, dst, wt = array("l"), array("l"), array("d")
+		src.extend(range(N)) #job edges first, so job i's arc is offsets[i]
+		dst.extend(range(N, 2*N))
+		wt.extend(durations)
+		for i in range(N): 
+			src.extend((s, i+N))
+			dst.extend((i, t))
+			wt.extend((0.0, 0.0))
+		for i, j in precedences: 
+			if not (0 <= i < N and 0 <= j < N): raise ValueError(f"Unknown job in constraint ({i}, {j})")
+			src.append(i+N)
+			dst.append(j)
+			wt.append(0.0)
+		self.graph = CSRGraph.from_arrays(2*N+2, src, dst, wt, directed=True)
+		self.sp = AcyclicSP(self.graph, s, longest=True) #raises on cyclic constraints
+
+	def reschedule(self, durations):
+		"""Recompute schedule for new durations, reusing the topological order"""
+		if len(durations) != self.N: raise ValueError("Expected one duration per job")
+		for i in range(self.N): self.graph.weights[self.graph.offsets[i]] = durations[i]
+		self.sp.run()
+		return self
+
+	def start(self, i):
+		"""Return earliest start time of job i"""
+		return self.sp.dist_to(i)
+
+	def finish(self):
+		"""Return completion time of all jobs (makespan)"""
+		return self.sp.dist_to(2*self.N+1) if self.N else 0.0
+
+	def critical_path(self):
+		"""Return the jobs on a critical path in order of execution"""
+		jobs = []
+		v = 2*self.N + 1
+		while self.N and v != 2*self.N: 
+			e = self.sp._edge_to[v]
+			v = self.graph.tail(e)
+			if v < self.N: jobs.append(v) #arc was a job edge
+		jobs.reverse()
+		return jobs
 
-#CPM -- critical path method 
 
 #A negative cycle is a directed cycle whose sum of edge weights is negative. 
 #A SPT exists iff no negative cycles. 
@@ -486,6 +1008,538 @@ Dijkstra (binary heap) | no negative weights | Elog(V)      | Elog(V)    | V
 
 """
 
+from collections import deque
+
+class BellmanFordSP(ShortestPath):
+	"""Queue-based Bellman-Ford shortest paths (negative weights allowed)
+
+	Only vertices whose dist_to changed in the previous pass are put on the 
+	FIFO queue (at most once at a time), so edges pointing from unchanged 
+	vertices are never relaxed again. Every V relaxations, the parent graph 
+	edge_to[] is checked for a cycle; any such cycle is a negative cycle 
+	reachable from s, at which point the search stops. 
+	"""
+	def __init__(self, digraph, source):
+		super().__init__(digraph, source)
+		V = len(self.graph)
+		self._from = array("l", [-1]) * V #tail of edge_to[v]
+		self._cycle = None 
+		on_queue = bytearray(V)
+		queue = deque([source])
+		on_queue[source] = True
+		offsets, targets = self.graph.offsets, self.graph.targets
+		dist_to, edge_to = self._dist_to, self._edge_to
+		cost = 0 #number of relaxations since the last cycle check
+		while queue:
+			v = queue.popleft()
+			on_queue[v] = False 
+			for e in range(offsets[v], offsets[v+1]): #relax arc e=v->w
+				w = targets[e]
+				dist = dist_to[v] + self.graph.weight(e)
+				if dist_to[w] > dist: 
+					dist_to[w] = dist 
+					edge_to[w] = e
+					self._from[w] = v
+					if not on_queue[w]: 
+						queue.append(w)
+						on_queue[w] = True 
+				cost += 1
+				if cost >= V: 
+					cost = 0
+					self._cycle = self._find_negcycle()
+					if self._cycle is not None: return 
+
+	def _find_negcycle(self):
+		"""Return the edges of a cycle in the parent graph (or None)"""
+		parent = self._from
+		walk = array("l", [-1]) * len(parent) #walk that first reached v
+		for s in range(len(parent)):
+			v = s
+			while v != -1 and walk[v] == -1: 
+				walk[v] = s
+				v = parent[v]
+			if v != -1 and walk[v] == s: #walk from s closed a cycle at v
+				cycle = Stack()
+				w = v
+				while True: 
+					cycle.push(DirectredEdge(parent[w], w, self.graph.weight(self._edge_to[w])))
+					w = parent[w]
+					if w == v: return cycle 
+		return None
+
+	def has_negcycle(self):
+		"""Return True if a negative cycle is reachable from the source"""
+		return self._cycle is not None
+
+	def negcycle(self):
+		"""Return the edges of a negative cycle (None if there is none)"""
+		return self._cycle
+
+	def dist_to(self, v):
+		if self.has_negcycle(): raise ValueError("Negative cost cycle exists")
+		return self._dist_to[v]
+
+	def path_to(self, v):
+		if self.has_negcycle(): raise ValueError("Negative cost cycle exists")
+		return super().path_to(v)
+
+
+"""ALL-PAIRS SHORTEST PATHS
+     algorithm | restriction         | time              | best for
+-----------------------------------------------------------------------
+       Johnson | no negative cycles  | VElog(V)          | sparse graphs
+Floyd-Warshall | no negative cycles  | V**3              | dense graphs
+-----------------------------------------------------------------------
+
+Johnson (1977) -- add a vertex q with 0-weight edges to every vertex, run 
+Bellman-Ford from q to get potentials h[v], and reweight each edge v->w as
+weight + h[v] - h[w] >= 0 (path lengths change by h[s] - h[t] only). Then 
+run Dijkstra from every source; the sources are independent, so they are 
+spread over worker processes writing their rows straight into the result. 
+
+Floyd-Warshall -- dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j]) for
+k = 0..V-1. The blocked version processes k in blocks of b: first the b rows 
+of the block (they hold the pivot rows D[k] for the rest), then every other 
+stripe of b rows, so each stripe stays in cache across the b values of k. 
+With NumPy each update of a stripe is one vectorized operation. 
+
+The V-by-V distance matrix lives in one flat float64 buffer -- a memory-
+mapped file when a path is given, so tables larger than RAM can be built and 
+later reopened without recomputation (AllPairsSP.open). The file starts with
+a 16-byte header (magic, negative-cycle flag, V) followed by the row-major 
+matrix as native float64.
+"""
+import mmap
+import struct
+from csr import read_header
+
+APSP_MAGIC = b"APS1"
+APSP_HEADER = struct.Struct("=4sIq") #magic, negative-cycle flag, V
+try: 
+	import numpy as np
+except ImportError: #pure-Python fallback 
+	np = None
+
+def _johnson_rows(specs, V, h, lo, hi, out):
+	"""Worker -- Dijkstra on the reweighted graph from sources lo..hi-1, 
+	rows written into the output matrix ("file", path, offset) or ("shm", 
+	name, offset)"""
+	blocks, views = zip(*(attach(*spec) for spec in specs))
+	if out[0] == "file": 
+		f = open(out[1], "r+b")
+		buf = mmap.mmap(f.fileno(), 0)
+	else: 
+		f, buf = None, SharedMemory(name=out[1])
+	off = out[2] #matrix offset in the buffer
+	matrix = (memoryview(buf) if f else buf.buf)[off:off + 8*V*V].cast("d")
+	try: 
+		graph = CSRGraph(V, *views, directed=True)
+		_johnson_fill(graph, array("d", h), matrix, lo, hi)
+	finally: 
+		matrix.release()
+		for view in views: view.release()
+		for shm in blocks: shm.close()
+		if f: 
+			buf.flush()
+			buf.close()
+			f.close()
+		else: 
+			buf.close()
+
+def _johnson_fill(graph, h, matrix, lo, hi):
+	"""Write rows lo..hi-1 of the distance matrix from reweighted Dijkstra"""
+	V = len(graph)
+	inf = float("inf")
+	for s in range(lo, hi):
+		sp = DijkstraSP(graph, s)
+		dist = sp._dist_to
+		matrix[s*V:(s+1)*V] = array("d", (dist[v] - h[s] + h[v] if dist[v] < inf else inf for v in range(V)))
+
+def _floyd_blocked(D, block):
+	"""In-place blocked Floyd-Warshall on a V-by-V NumPy array"""
+	V = len(D)
+	for kb in range(0, V, block):
+		ke = min(kb + block, V)
+		R = D[kb:ke]
+		for k in range(kb, ke): #row panel (incl. diagonal block)
+			np.minimum(R, R[:, k, None] + D[k], out=R)
+		for lo in range(0, V, block): #every other row stripe
+			if lo == kb: continue 
+			S = D[lo:lo+block]
+			for k in range(kb, ke):
+				np.minimum(S, S[:, k, None] + D[k], out=S)
+
+def _floyd(D, V):
+	"""In-place Floyd-Warshall on a flat V*V buffer (pure Python)"""
+	inf = float("inf")
+	for k in range(V):
+		dk = D[k*V:(k+1)*V].tolist()
+		for i in range(V):
+			dik = D[i*V + k]
+			if dik == inf: continue 
+			row = D[i*V:(i+1)*V].tolist()
+			D[i*V:(i+1)*V] = array("d", [a if a <= dik + b else dik + b for a, b in zip(row, dk)])
+
+
+class AllPairsSP:
+	"""All-pairs shortest paths via Johnson or (blocked) Floyd-Warshall"""
+	def __init__(self, digraph, method="auto", path=None, workers=None, block=256):
+		"""Compute the V-by-V distance matrix 
+		method  -- "johnson", "floyd" or "auto" (Floyd-Warshall when dense);
+		path    -- file to memory-map the matrix into (in memory if None);
+		workers -- processes for Johnson's Dijkstra runs;
+		block   -- Floyd-Warshall block size."""
+		graph = as_csr(digraph)
+		V = self.V = len(graph)
+		E = len(graph.targets)
+		if method == "auto": 
+			method = "floyd" if np is not None and V <= 10000 and E >= V*V//16 else "johnson"
+		if method not in ("johnson", "floyd"): 
+			raise ValueError(f"Unknown all-pairs method {method!r}")
+		self.method = method
+		self.path = path
+		self._negcycle = False 
+		self._offset = 0 if path is None else APSP_HEADER.size 
+		shared = method == "johnson" and workers and workers > 1 and path is None
+		self._buf = self._allocate(8*V*V, path, shared)
+		try: 
+			if method == "johnson": self._johnson(graph, workers)
+			else: self._floyd(graph, block)
+		finally: 
+			if shared: #move result out of shared memory
+				shm = self._buf
+				self._buf = bytearray(shm.buf)
+				shm.close()
+				shm.unlink()
+		if path is not None: 
+			self._buf[:APSP_HEADER.size] = APSP_HEADER.pack(APSP_MAGIC, self._negcycle, V)
+			self._buf.flush()
+		self._view()
+
+	@classmethod
+	def open(cls, path):
+		"""Reopen a distance matrix written with path=... (read-only mapping, 
+		nothing is recomputed or parsed)"""
+		(negcycle, V), buf = read_header(path, APSP_HEADER, APSP_MAGIC, "an all-pairs distance matrix")
+		if len(buf) < APSP_HEADER.size + 8*V*V: raise ValueError(f"{path} is truncated")
+		apsp = cls.__new__(cls)
+		apsp.V, apsp.method, apsp.path = V, None, path
+		apsp._negcycle, apsp._offset, apsp._buf = bool(negcycle), APSP_HEADER.size, buf
+		apsp._view()
+		return apsp
+
+	def _view(self):
+		"""Expose the buffer as the V-by-V matrix (NumPy array if available)"""
+		V, off = self.V, self._offset
+		if np is not None: 
+			self.matrix = np.frombuffer(self._buf, dtype=np.float64, count=V*V, offset=off).reshape(V, V)
+		else: 
+			self.matrix = memoryview(self._buf)[off:off + 8*V*V].cast("d", (V, V)) if V else []
+
+	@staticmethod
+	def _allocate(size, path, shared):
+		"""Return a zeroed buffer of given size (file mapping after a header, 
+		shared memory block or plain bytearray)"""
+		if path is not None: 
+			size += APSP_HEADER.size
+			with open(path, "w+b") as f: 
+				f.truncate(size)
+				return mmap.mmap(f.fileno(), size)
+		if shared: return SharedMemory(create=True, size=max(size, 1))
+		return bytearray(size)
+
+	def _johnson(self, graph, workers):
+		"""Bellman-Ford reweighting + V Dijkstra runs"""
+		V, A = self.V, len(graph.targets)
+		weights = array("d", graph.weights) if graph.weights is not None else array("d", [1.0]) * A
+		aug = CSRGraph(V+1, #vertex V is the extra source q
+		               array("l", graph.offsets) + array("l", [A + V]), 
+		               array("l", graph.targets) + array("l", range(V)), 
+		               weights + array("d", [0.0]) * V, directed=True)
+		bf = BellmanFordSP(aug, V)
+		if bf.has_negcycle(): 
+			self._negcycle = True 
+			return 
+		h = bf._dist_to
+		offsets, targets = aug.offsets, aug.targets
+		for v in range(V): 
+			for e in range(offsets[v], offsets[v+1]): 
+				weights[e] = max(0.0, weights[e] + h[v] - h[targets[e]])
+		reweighted = CSRGraph(V, offsets[:V+1], targets[:A], weights[:A], directed=True)
+		if not (workers and workers > 1): 
+			matrix = memoryview(self._buf)[self._offset:self._offset + 8*V*V].cast("d")
+			_johnson_fill(reweighted, h, matrix, 0, V)
+			matrix.release()
+			return 
+		out = ("file", self.path, self._offset) if self.path is not None else ("shm", self._buf.name, 0)
+		if self.path is not None: self._buf.flush()
+		blocks = [share(reweighted.offsets), share(reweighted.targets), share(reweighted.weights)]
+		try: 
+			cuts = [V*i//workers for i in range(workers+1)]
+			with ProcessPoolExecutor(workers) as pool:
+				specs = [(shm.name, data.typecode, len(data)) for shm, data in 
+				         zip(blocks, (reweighted.offsets, reweighted.targets, reweighted.weights))]
+				futures = [pool.submit(_johnson_rows, specs, V, h[:V].tobytes(), lo, hi, out)
+				           for lo, hi in zip(cuts, cuts[1:]) if lo < hi]
+				for future in futures: future.result()
+		finally: 
+			for shm in blocks: 
+				shm.close()
+				shm.unlink()
+
+	def _floyd(self, graph, block):
+		"""Blocked Floyd-Warshall over the distance matrix"""
+		V, off = self.V, self._offset
+		D = memoryview(self._buf)[off:off + 8*V*V].cast("d")
+		D[:] = array("d", [float("inf")]) * (V*V)
+		for v in range(V): 
+			D[v*V + v] = 0.0
+			for e in graph.arcs(v): 
+				w = graph.targets[e]
+				D[v*V + w] = min(D[v*V + w], graph.weight(e))
+		if np is not None: 
+			_floyd_blocked(np.frombuffer(self._buf, dtype=np.float64, count=V*V, offset=off).reshape(V, V), block)
+		else: 
+			_floyd(D, V)
+		self._negcycle = any(D[v*V + v] < 0 for v in range(V))
+		D.release()
+
+	def has_negcycle(self):
+		"""Return True if the digraph has a negative cycle"""
+		return self._negcycle
+
+	def dist(self, s, t):
+		"""Return length of shortest path from s to t (inf if none)"""
+		if self._negcycle: raise ValueError("Negative cost cycle exists")
+		return self.matrix[s, t]
+
+	def has_path(self, s, t):
+		"""Return True if t is reachable from s"""
+		return self.dist(s, t) < float("inf")
+
+
+"""CONTRACTION HIERARCHIES (Geisberger et al., 2008)
+Preprocessing -- contract the vertices one at a time, least important first.
+Contracting v removes it from the graph; for every remaining pair u->v->w a 
+shortcut u->w of length w(u,v) + w(v,w) is added unless a witness path u~>w 
+avoiding v is no longer (found by a Dijkstra bounded in vertices settled). 
+Importance is the edge difference (shortcuts added - arcs removed) plus the 
+number of contracted neighbours, kept in a heap and re-evaluated lazily when
+popped (pushed back if it is no longer the minimum). 
+
+Query -- the rank of v is its position in the contraction order. Among the 
+shortest s-t paths in the graph plus shortcuts there is an up-down one, i.e.
+ranks increase up to its highest vertex and then decrease. So a forward 
+Dijkstra from s over upward arcs and a backward Dijkstra from t over reversed
+downward arcs meet at that vertex, each side stopping once its smallest key 
+reaches the best s-t length so far. Both search spaces stay tiny compared to 
+a plain Dijkstra (hundreds of vertices on road networks). 
+
+Each shortcut remembers its middle vertex v, so paths are unpacked into 
+original edges on demand. 
+
+The upward and (reversed) downward graphs are CSR arrays, so the hierarchy 
+is saved as a binary blob: 32-byte header (magic, flags, V, number of up and
+down arcs), then rank, and offsets/targets/weights/middles of each graph as
+native 8-byte values, which load() maps into memory without parsing. 
+"""
+import struct
+from csr import write_arrays, read_header, map_arrays
+
+CH_MAGIC = b"CHG1"
+CH_HEADER = struct.Struct("=4sIqqq") #magic, flags (unused), V, up arcs, down arcs
+
+def _witness(out, s, skip, bound, limit):
+	"""Bounded Dijkstra from s avoiding vertex skip; return tentative dists"""
+	dist = {s: 0.0}
+	pq = [(0.0, s)]
+	settled = 0
+	while pq and settled < limit:
+		d, v = heappop(pq)
+		if d > bound: break 
+		if d > dist[v]: continue #stale entry
+		settled += 1
+		for w, (weight, _) in out[v].items():
+			if w == skip: continue 
+			if d + weight < dist.get(w, float("inf")):
+				dist[w] = d + weight
+				heappush(pq, (d + weight, w))
+	return dist
+
+def _flatten(lists):
+	"""Return CSR arrays (offsets, targets, weights, middles) of per-vertex
+	lists of (target, weight, middle)"""
+	offsets, targets, weights, middles = array("l", [0]), array("l"), array("d"), array("l")
+	for arcs in lists:
+		for w, weight, middle in arcs:
+			targets.append(w)
+			weights.append(weight)
+			middles.append(middle)
+		offsets.append(len(targets))
+	return offsets, targets, weights, middles
+
+
+class ContractionHierarchy:
+	"""Point-to-point shortest paths on a contraction hierarchy"""
+	def __init__(self, digraph, limit=64):
+		"""Contract every vertex of given digraph (weights must be non-negative);
+		limit bounds the vertices settled by each witness search"""
+		graph = as_csr(digraph)
+		V = len(graph)
+		out = [{} for _ in range(V)] #remaining arcs v->w as {w: (weight, middle)}
+		inn = [{} for _ in range(V)] #same arcs seen from w, {v: (weight, middle)}
+		for v in range(V):
+			for e in graph.arcs(v):
+				w, weight = graph.targets[e], graph.weight(e)
+				if weight < 0: raise ValueError("Contraction hierarchies need non-negative weights")
+				if w != v and (w not in out[v] or weight < out[v][w][0]): #keep lightest parallel arc
+					out[v][w] = inn[w][v] = (weight, -1)
+
+		contracted = array("l", [0]) * V #number of contracted neighbours
+		rank = array("l", [0]) * V
+		up = [None] * V   #v->w with rank[w] > rank[v]
+		down = [None] * V #v->u for arcs u->v with rank[u] > rank[v]
+		pq = [(len(self._shortcuts(v, out, inn, limit)) - len(out[v]) - len(inn[v]), v) for v in range(V)]
+		heapify(pq)
+		order = 0
+		while pq:
+			_, v = heappop(pq)
+			shortcuts = self._shortcuts(v, out, inn, limit)
+			priority = len(shortcuts) - len(out[v]) - len(inn[v]) + contracted[v]
+			if pq and priority > pq[0][0]: #lazy update
+				heappush(pq, (priority, v))
+				continue 
+			rank[v] = order
+			order += 1
+			up[v] = [(w, weight, middle) for w, (weight, middle) in out[v].items()]
+			down[v] = [(u, weight, middle) for u, (weight, middle) in inn[v].items()]
+			for w in out[v]: 
+				del inn[w][v]
+				contracted[w] += 1
+			for u in inn[v]: 
+				del out[u][v]
+				contracted[u] += 1
+			out[v] = inn[v] = None 
+			for u, w, length in shortcuts:
+				if w not in out[u] or length < out[u][w][0]:
+					out[u][w] = inn[w][u] = (length, v)
+		self._build(V, rank, _flatten(up), _flatten(down))
+
+	def _build(self, V, rank, up, down):
+		"""Set up the upward and downward search graphs from CSR arrays"""
+		self.rank = rank
+		self._up = CSRGraph(V, *up[:3], directed=True)
+		self._down = CSRGraph(V, *down[:3], directed=True)
+		self._up_middle, self._down_middle = up[3], down[3]
+
+	@staticmethod
+	def _shortcuts(v, out, inn, limit):
+		"""Return the shortcuts (u, w, length) that contracting v requires"""
+		shortcuts = []
+		if not out[v]: return shortcuts
+		for u, (lu, _) in inn[v].items():
+			bound = max((lu + lw for w, (lw, _) in out[v].items() if w != u), default=None)
+			if bound is None: continue 
+			dist = _witness(out, u, v, bound, limit)
+			for w, (lw, _) in out[v].items():
+				if w != u and dist.get(w, float("inf")) > lu + lw: 
+					shortcuts.append((u, w, lu + lw))
+		return shortcuts
+
+	def __len__(self):
+		"""Return number of vertices"""
+		return len(self.rank)
+
+	def _search(self, s, t):
+		"""Bidirectional upward Dijkstra; return (length, meeting vertex, 
+		parent arcs of both sides)"""
+		inf = float("inf")
+		dist = ({s: 0.0}, {t: 0.0})
+		parent = ({s: -1}, {t: -1})
+		pqs = ([(0.0, s)], [(0.0, t)])
+		graphs = (self._up, self._down)
+		best, meet = (0.0, s) if s == t else (inf, -1)
+		side = 0
+		while any(pq and pq[0][0] < best for pq in pqs):
+			if not (pqs[side] and pqs[side][0][0] < best): side ^= 1 #other side is done
+			d, v = heappop(pqs[side])
+			if d == dist[side][v]: 
+				other = dist[1-side].get(v)
+				if other is not None and d + other < best: best, meet = d + other, v
+				graph, dist_side = graphs[side], dist[side]
+				offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+				for e in range(offsets[v], offsets[v+1]):
+					w, nd = targets[e], d + weights[e]
+					if nd < dist_side.get(w, inf): 
+						dist_side[w] = nd
+						parent[side][w] = e
+						heappush(pqs[side], (nd, w))
+			side ^= 1
+		return best, meet, parent
+
+	def query(self, s, t):
+		"""Return length of shortest path from s to t (inf if none)"""
+		return self._search(s, t)[0]
+
+	def path(self, s, t):
+		"""Return shortest path from s to t as a stack of original edges (None
+		if t is not reachable)"""
+		best, meet, parent = self._search(s, t)
+		if best == float("inf"): return None 
+		arcs = [] #(u, w, weight, middle) in s-t order
+		v = meet
+		while parent[0][v] != -1: 
+			e = parent[0][v]
+			u = self._up.tail(e)
+			arcs.append((u, v, self._up.weights[e], self._up_middle[e]))
+			v = u
+		arcs.reverse()
+		v = meet
+		while parent[1][v] != -1: 
+			e = parent[1][v]
+			w = self._down.tail(e)
+			arcs.append((v, w, self._down.weights[e], self._down_middle[e]))
+			v = w
+		edges = []
+		stack = arcs[::-1]
+		while stack: #unpack shortcuts u->w via middle m into u->m, m->w
+			u, w, weight, m = stack.pop()
+			if m == -1: 
+				edges.append(DirectredEdge(u, w, weight))
+				continue 
+			stack.append((m, w) + self._arc(self._up, self._up_middle, m, w))
+			stack.append((u, m) + self._arc(self._down, self._down_middle, m, u))
+		path = Stack()
+		for edge in reversed(edges): path.push(edge)
+		return path
+
+	@staticmethod
+	def _arc(graph, middles, v, w):
+		"""Return (weight, middle) of the arc v->w of an up/down graph"""
+		for e in range(graph.offsets[v], graph.offsets[v+1]):
+			if graph.targets[e] == w: return graph.weights[e], middles[e]
+		raise ValueError(f"Missing arc {v}->{w} in contraction hierarchy")
+
+	def save(self, path):
+		"""Write the hierarchy as a binary blob (see load)"""
+		up, down = self._up, self._down
+		with open(path, "wb") as f:
+			f.write(CH_HEADER.pack(CH_MAGIC, 0, len(self.rank), len(up.targets), len(down.targets)))
+			write_arrays(f, (self.rank, "q"))
+			for graph, middles in ((up, self._up_middle), (down, self._down_middle)):
+				write_arrays(f, (graph.offsets, "q"), (graph.targets, "q"), (graph.weights, "d"), (middles, "q"))
+
+	@classmethod
+	def load(cls, path, mapped=True):
+		"""Load a hierarchy written by save, memory-mapped unless mapped=False"""
+		(_, V, U, D), buf = read_header(path, CH_HEADER, CH_MAGIC, "a contraction hierarchy", mapped)
+		sizes = [("q", V)] + [(code, n) for A in (U, D) for code, n in 
+		                      (("q", V+1), ("q", A), ("d", A), ("q", A))]
+		arrays = map_arrays(path, buf, CH_HEADER.size, sizes, mapped)
+		ch = cls.__new__(cls)
+		ch._build(V, arrays[0], arrays[1:5], arrays[5:9])
+		return ch
+
 
 """
 s: source; t: target
@@ -553,9 +1607,11 @@ class FlowEdge:
 	"""flow-edge v->w"""
 	def __init__(self, v, w, capacity):
 		"""Create a flow edge v->w"""
+		if capacity < 0: raise ValueError("Edge capacity must be non-negative")
 		self.v = v
 		self.w = w
-		self.capacity = capacity
+		self._capacity = capacity
+		self._flow = 0
 
 	def from_(self):
 		return self.v
@@ -564,10 +1620,10 @@ class FlowEdge:
 		return self.w
 
 	def capacity(self):
-		return self.capacity
+		return self._capacity
 
 	def flow(self):
-		return self.flow
+		return self._flow
 
 	def other(self, vertex):
 		if vertex == self.v: 
@@ -577,102 +1633,71 @@ class FlowEdge:
 		else: 
 			raise ValueError("Illegal endpoint")
 
-	def residual_capacity(self, vertex):
+	def residual_capacity_to(self, vertex):
 		if vertex == self.v: #backward edge
-			return self.flow
+			return self._flow
 		elif vertex == self.w: #forward edge
-			return self.capacity - self.flow
+			return self._capacity - self._flow
 		else:
 			raise ValueError("Illegal endpoint")
 
-	def add_residual_flow(self, vertex, delta):
+	def add_residual_flow_to(self, vertex, delta):
 		if vertex == self.v: #backward edge
-			self.flow -= delta
+			self._flow -= delta
 		elif vertex == self.w: #forward edge
-			self.flow += delta
+			self._flow += delta
 		else:
-			raise ValueError(Illegal endpoint)
+			raise ValueError("Illegal endpoint")
+
+	def __str__(self):
+		return f"{self.v} -> {self.w} {self._flow}/{self._capacity}"
 
 
 class FlowNetwork:
 	"""Same as EdgeWeightedGraph but adjacency list of FlowEdges instead of Edges"""
 	def __init__(self, V):
 		"""Create an empty flow network with V vertices"""
-		self.V = V
-		
+		self._V = V
+		self._E = 0
+		self._adj = [Bag() for _ in range(V)]
+		self._edges = [] #each edge once, edge k is the k-th added
+
 	def add_edge(self, edge):
 		"""Add flow edge to flow network"""
 		v = edge.from_()
 		w = edge.to()
-		self.adj[v].add(edge) #add forward edge
-		self.adj[w].add(edge) #add backward edge
+		self._adj[v].add(edge) #add forward edge
+		self._adj[w].add(edge) #add backward edge
+		self._edges.append(edge)
+		self._E += 1
 
 	def adj(self, v):
 		"""Return forward and backward edges incident to given vertex"""
-		pass
+		return self._adj[v]
 
 	def edges(self):
-		"""Return all edges in this flow network"""
-		pass
+		"""Return all edges in this flow network (in order of insertion)"""
+		return list(self._edges)
 
 	def __len__(self):
 		"""Return number of vertices"""
-		pass
+		return self._V
+
+	def V(self):
+		"""Return number of vertices"""
+		return self._V
 
 	def E(self):
 		"""Return number of edges"""
-		pass
+		return self._E
 
 	def __str__(self):
 		"""Return string representation of flow network"""
-		pass
-
-class FordFulkerson:
-	"""Ford-Fulkerson implementation"""
-	def __init__(self, graph, s, t):
-		""""""
-		self.marked = [False] * len(graph)
-		self.value = 0
-		while self.has_augpath(graph, s, t):
-			bottle = float('inf')
-			v = t 
-			#compare bottleneck capacity
-			while v:
-				bottle = min(bottle, self.edge_to[v].residual_capacity_to(v))
-				v = self.edge_to[v].other(v)
-			#augment flow
-			v = t
-			while v:
-				self.edge_to[v].add_residual_flow_to(v, bottle)
-
-			self.value += bottle
-
-	def has_augpath(self, graph, s, t):
-		"""Breadth-first search"""
-		self.edge_to = [False] * len(graph)
-		self.marked = [False] * len(graph)
-		q = Queue()
-		q.enqueue(s)
-		self.marked[s] = True
-
-		while q:
-			v = q.dequeue()
-			for edge in graph.adj(v):
-				w = edge.other(v)
-				if edge.residual_capacity_to(w) > 0 and not self.marked[w]:
-				#found path from s to w in the residual network?
-					self.edge_to[w] = edge #save last edge on path to w
-					self.marked[w] = True  #mark w
-					q.enqueue(w)           #add w to queue
-
-		return self.marked[t] #is t reachable from s in residual network?
-
-	def value(self):
-		return self.value
+		ans = f"{self._V} {self._E}\n"
+		for v in range(self._V):
+			ans += f"{v}: " + "  ".join(str(edge) for edge in self._adj[v] if edge.from_() == v) + "\n"
+		return ans
 
-	def in_cut(self, v):
-		"""Return True if given vertex is reachable from s in residual network"""
-		return self.marked[v]
 
 """
 MAXIMUM FLOW ALGORITHMS
@@ -688,4 +1713,643 @@ year | method                   | worst case                 | discovered by
 1985 | capacity scaling         | E**2 * log(U)              | Gabow
 1997 | length function          | E**(3/2) * log(E) * Log(U) | Goldberg-Rao
 2012 | compact network          | E**2 / log(E)              | Orlin 
-"""
\ No newline at end of file
+"""
+
+"""RESIDUAL NETWORK (array-based)
+Edge k of the network is stored as the pair of arcs 2k (v->w, forward) and 
+2k+1 (w->v, backward), so the partner of arc e is e^1. Two parallel arrays 
+hold the head and the residual capacity of every arc, i.e. 
+* res[2k]   = capacity - flow (room left on forward arc);
+* res[2k+1] = flow            (flow that can be cancelled).
+Augmenting by delta along arc e is res[e] -= delta; res[e^1] += delta. The 
+arcs leaving v are listed in adj[v] (array of arc indices). No edge objects 
+are involved, so the solvers below run on millions of edges. 
+
+Dinic (1970) -- BFS from s labels each vertex by its level (distance in the 
+residual network); a blocking flow is then sent along arcs going one level 
+up, found by DFS where a current-arc pointer per vertex skips arcs that are 
+already saturated or lead to dead ends. At most V phases, ~ E*V**2 overall 
+(E*sqrt(V) on unit-capacity bipartite graphs). 
+
+Push-relabel (Goldberg-Tarjan, 1988) -- keep a preflow (inflow >= outflow) 
+and heights with s at V; an active vertex (positive excess) pushes excess 
+along residual arcs one step down, and is relabelled (lifted to 1 + lowest 
+residual neighbour) when it cannot. Highest-label selection processes the 
+active vertex of greatest height first ~ V**2 * sqrt(E). Gap heuristic: if 
+no vertex is left at height k < V, vertices above k cannot reach t any more 
+and are lifted to V+1 at once, returning their excess to s. 
+"""
+
+class ResidualNetwork:
+	"""Flow network as arrays of paired arcs"""
+	def __init__(self, V):
+		"""Create an empty residual network with V vertices"""
+		self.adj = [array("l") for _ in range(V)] #arcs leaving each vertex
+		self.head = array("l") #head vertex of each arc
+		self.res = array("d")  #residual capacity of each arc
+
+	@classmethod
+	def from_arrays(cls, V, src, dst, capacity):
+		"""Build a residual network from parallel edge arrays"""
+		if len(dst) != len(src) or len(capacity) != len(src):
+			raise ValueError("Edge arrays must have the same length")
+		network = cls(V)
+		for i in range(len(src)): network.add_edge(src[i], dst[i], capacity[i])
+		return network
+
+	def __len__(self):
+		"""Return number of vertices"""
+		return len(self.adj)
+
+	def V(self):
+		"""Return number of vertices"""
+		return len(self.adj)
+
+	def E(self):
+		"""Return number of edges"""
+		return len(self.head)//2
+
+	def add_edge(self, v, w, capacity):
+		"""Add edge v->w with given capacity and return its index"""
+		if capacity < 0: raise ValueError("Edge capacity must be non-negative")
+		k = len(self.head)//2
+		self.head.extend((w, v))
+		self.res.extend((capacity, 0.0))
+		self.adj[v].append(2*k)
+		self.adj[w].append(2*k+1)
+		return k
+
+	def copy(self):
+		"""Return an independent copy of the network (flow included)"""
+		network = ResidualNetwork(len(self.adj))
+		network.adj = [array("l", arcs) for arcs in self.adj]
+		network.head = array("l", self.head)
+		network.res = array("d", self.res)
+		return network
+
+	def endpoints(self, k):
+		"""Return (v, w) of edge k"""
+		return self.head[2*k+1], self.head[2*k]
+
+	def capacity(self, k):
+		"""Return capacity of edge k"""
+		return self.res[2*k] + self.res[2*k+1]
+
+	def flow(self, k):
+		"""Return flow on edge k"""
+		return self.res[2*k+1]
+
+	def edges(self):
+		"""Yield each edge as (v, w, capacity, flow)"""
+		for k in range(self.E()):
+			yield self.head[2*k+1], self.head[2*k], self.capacity(k), self.flow(k)
+
+
+def as_residual(network):
+	"""Return given network as a ResidualNetwork
+
+	A ResidualNetwork is returned as is (solvers then update its flow in 
+	place); a FlowNetwork is copied with edge k being its k-th edge.
+	"""
+	if isinstance(network, ResidualNetwork): return network
+	residual = ResidualNetwork(len(network))
+	for edge in network.edges():
+		residual.add_edge(edge.from_(), edge.to(), edge.capacity())
+	return residual
+
+
+class MaxFlow:
+	"""Maximum st-flow and minimum st-cut
+
+	MaxFlow(network, s, t, method) runs one of the engines below, i.e.
+	* "ford_fulkerson" -- shortest augmenting paths (Edmonds-Karp) ~ E**2 * V;
+	* "dinic"          -- blocking flows on BFS level graphs ~ E * V**2;
+	* "push_relabel"   -- highest-label preflow-push with gaps ~ V**2 * sqrt(E).
+	Engines pass method=None and fill in the residual network themselves. When
+	given a FlowNetwork, the flow is written back to its FlowEdges. 
+	"""
+	engines = {} #method -> engine class (registered below)
+
+	def __init__(self, network, s, t, method="dinic", **options):
+		self.network = as_residual(network)
+		V = len(self.network)
+		if not (0 <= s < V and 0 <= t < V): raise ValueError("Source or sink out of range")
+		if s == t: raise ValueError("Source equals sink")
+		self.s, self.t = s, t
+		self.value = 0 
+		self._marked = None #vertices on the s side of the min cut
+		if method is not None: 
+			if method not in MaxFlow.engines: 
+				raise ValueError(f"Unknown max-flow method {method!r}")
+			engine = MaxFlow.engines[method](self.network, s, t, **options)
+			self.value = engine.value 
+			if not isinstance(network, ResidualNetwork): 
+				for k, edge in enumerate(network.edges()): edge._flow = self.network.flow(k)
+
+	def in_cut(self, v):
+		"""Return True if given vertex is reachable from s in residual network"""
+		if self._marked is None: 
+			adj, head, res = self.network.adj, self.network.head, self.network.res
+			marked = self._marked = bytearray(len(self.network))
+			marked[self.s] = 1
+			stack = array("l", [self.s])
+			while stack: 
+				x = stack.pop()
+				for e in adj[x]: 
+					y = head[e]
+					if res[e] > 0 and not marked[y]: 
+						marked[y] = 1
+						stack.append(y)
+		return bool(self._marked[v])
+
+	def min_cut(self):
+		"""Return indices of the edges from the s side to the t side of a min cut
+		(their capacities sum to value)"""
+		head = self.network.head
+		return [k for k in range(self.network.E()) 
+		        if self.in_cut(head[2*k+1]) and not self.in_cut(head[2*k])]
+
+	def _inflow(self):
+		"""Return net flow into t"""
+		net = self.network
+		return sum(net.flow(e//2) if e % 2 else -net.flow(e//2) for e in net.adj[self.t])
+
+	def _levels(self, level):
+		"""BFS from s over residual arcs; return True if t is reachable"""
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		for v in range(len(level)): level[v] = -1
+		level[self.s] = 0
+		queue = array("l", [self.s])
+		i = 0 
+		while i < len(queue): 
+			v = queue[i]
+			i += 1
+			for e in adj[v]: 
+				w = head[e]
+				if res[e] > 0 and level[w] < 0: 
+					level[w] = level[v] + 1
+					queue.append(w)
+		return level[self.t] >= 0
+
+
+class FordFulkerson(MaxFlow):
+	"""Ford-Fulkerson with shortest augmenting paths (Edmonds-Karp)"""
+	def __init__(self, network, s, t):
+		super().__init__(network, s, t, None)
+		head, res = self.network.head, self.network.res
+		edge_to = array("l", [-1]) * len(self.network) #last arc on path to v
+		while self.has_augpath(edge_to):
+			bottle = float("inf")
+			v = t
+			while v != s: #compute bottleneck capacity
+				bottle = min(bottle, res[edge_to[v]])
+				v = head[edge_to[v] ^ 1]
+			v = t
+			while v != s: #augment flow
+				e = edge_to[v]
+				res[e] -= bottle
+				res[e ^ 1] += bottle
+				v = head[e ^ 1]
+			self.value += bottle
+
+	def has_augpath(self, edge_to):
+		"""Breadth-first search for a shortest augmenting path"""
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		marked = bytearray(len(self.network))
+		marked[self.s] = 1
+		queue = array("l", [self.s])
+		i = 0
+		while i < len(queue) and not marked[self.t]:
+			v = queue[i]
+			i += 1
+			for e in adj[v]:
+				w = head[e]
+				if res[e] > 0 and not marked[w]:
+				#found path from s to w in the residual network?
+					edge_to[w] = e  #save last arc on path to w
+					marked[w] = 1   #mark w
+					queue.append(w) #add w to queue
+		return marked[self.t] #is t reachable from s in residual network?
+
+
+class Dinic(MaxFlow):
+	"""Dinic's blocking-flow algorithm"""
+	def __init__(self, network, s, t):
+		super().__init__(network, s, t, None)
+		V = len(self.network)
+		level = array("l", [-1]) * V
+		while self._levels(level):
+			self.value += self._blocking(level, array("l", [0]) * V)
+
+	def _blocking(self, level, current):
+		"""Send a blocking flow over the level graph (iterative DFS with 
+		current-arc pointers); return its value"""
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		s, t = self.s, self.t
+		flow = 0
+		path = array("l") #arcs from s to v
+		v = s
+		while True: 
+			if v == t: 
+				delta = min(res[e] for e in path)
+				cut = -1 #first saturated arc on path
+				for i, e in enumerate(path): 
+					res[e] -= delta
+					res[e ^ 1] += delta
+					if cut < 0 and res[e] == 0: cut = i
+				flow += delta
+				del path[cut:] #retreat to tail of saturated arc
+				v = head[path[-1]] if path else s
+				continue 
+			arcs, i = adj[v], current[v]
+			while i < len(arcs) and not (res[arcs[i]] > 0 and level[head[arcs[i]]] == level[v] + 1): 
+				i += 1
+			current[v] = i
+			if i < len(arcs): #advance
+				path.append(arcs[i])
+				v = head[arcs[i]]
+			elif v == s: 
+				return flow 
+			else: #dead end, retreat
+				level[v] = -1
+				v = head[path.pop() ^ 1]
+				current[v] += 1
+
+
+class PushRelabel(MaxFlow):
+	"""Highest-label push-relabel with gap heuristic"""
+	def __init__(self, network, s, t):
+		super().__init__(network, s, t, None)
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		V = len(self.network)
+		height = self._heights()
+		excess = array("d", [0.0]) * V
+		count = array("l", [0]) * (2*V+1) #number of vertices at each height
+		for v in range(V): count[height[v]] += 1
+		current = array("l", [0]) * V
+		active = bytearray(V)
+		buckets = [[] for _ in range(2*V+1)] #active vertices by height
+		top = 0 #highest non-empty bucket (upper bound)
+		for e in adj[s]: #saturate arcs out of s
+			w, delta = head[e], res[e]
+			if delta <= 0 or w == s: continue 
+			res[e] = 0.0
+			res[e ^ 1] += delta
+			excess[w] += delta
+			excess[s] -= delta
+			if w != t and not active[w]: 
+				active[w] = 1
+				buckets[height[w]].append(w)
+				top = max(top, height[w])
+		while top >= 0: 
+			if not buckets[top]: 
+				top -= 1
+				continue 
+			v = buckets[top].pop()
+			if height[v] != top: #lifted by a gap while queued 
+				buckets[height[v]].append(v)
+				top = max(top, height[v])
+				continue 
+			active[v] = 0
+			arcs = adj[v]
+			while excess[v] > 0: #discharge
+				if current[v] == len(arcs): #relabel
+					old = height[v]
+					new = min((height[head[e]] for e in arcs if res[e] > 0), default=2*V) + 1
+					if new >= 2*V: break #only float round-off is left (heights stay < 2V otherwise)
+					height[v] = new
+					current[v] = 0
+					count[old] -= 1
+					count[height[v]] += 1
+					if count[old] == 0 and old < V: #gap
+						for u in range(V): 
+							if old < height[u] < V: 
+								count[height[u]] -= 1
+								height[u] = V+1
+								count[V+1] += 1
+								current[u] = 0
+					continue 
+				e = arcs[current[v]]
+				w = head[e]
+				if res[e] > 0 and height[v] == height[w] + 1: #push
+					delta = min(excess[v], res[e])
+					res[e] -= delta
+					res[e ^ 1] += delta
+					excess[v] -= delta
+					excess[w] += delta
+					if w != s and w != t and not active[w]: 
+						active[w] = 1
+						buckets[height[w]].append(w)
+				else: 
+					current[v] += 1
+			top = max(top, height[v])
+		self.value = excess[t]
+
+	def _heights(self):
+		"""Return exact distances to t in the residual network (global 
+		relabelling), V for s and for vertices that cannot reach t"""
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		V = len(self.network)
+		height = array("l", [V]) * V
+		height[self.t] = 0
+		queue = array("l", [self.t])
+		i = 0
+		while i < len(queue): #BFS from t over reversed residual arcs
+			w = queue[i]
+			i += 1
+			for e in adj[w]: 
+				v = head[e]
+				if res[e ^ 1] > 0 and height[v] == V and v != self.s: 
+					height[v] = height[w] + 1
+					queue.append(v)
+		height[self.s] = V
+		return height
+
+
+MaxFlow.engines.update(ford_fulkerson=FordFulkerson, dinic=Dinic, push_relabel=PushRelabel)
+
+
+"""MINIMUM-COST FLOW
+Each edge also has a cost per unit of flow (cost[2k] = c, cost[2k+1] = -c 
+since cancelling flow refunds it); find a flow of given value (maximum by 
+default) of minimum total cost. 
+
+Successive shortest paths -- a max-flow pass first caps the value to send,
+so the supply at s and the demand at t are feasible. Keep potentials pi[v] 
+such that every residual arc has reduced cost cost + pi[v] - pi[w] >= 0 
+(Johnson's reweighting), so Dijkstra finds a cheapest augmenting path from a vertex with excess (supply)
+to one with deficit (demand); afterwards pi[v] += min(dist[v], dist[sink]) 
+keeps the reduced costs non-negative, also on the new reverse arcs. Arcs of 
+negative reduced cost are saturated up front, which also cancels negative 
+cycles, so no Bellman-Ford pass is needed. 
+
+Capacity scaling (Edmonds-Karp, 1972) -- in phase delta only arcs with at 
+least delta residual capacity are used and only vertices with at least delta
+excess/deficit are matched, so every augmentation sends >= delta. Phases go
+delta = 2**k, ..., 2, 1, followed by a last one over all residual arcs (for 
+fractional capacities); ~ E*log(U) shortest paths instead of up to U.
+
+Assignment problem -- n agents, m tasks, cost[i][j] of giving task j to agent
+i; a unit-capacity network s -> agents -> tasks -> t whose min-cost max flow
+is a min-cost maximum matching. 
+"""
+
+class CostNetwork(ResidualNetwork):
+	"""Residual network with a cost per unit of flow on each arc"""
+	def __init__(self, V):
+		super().__init__(V)
+		self.cost = array("d") #cost per unit of flow of each arc
+
+	@classmethod
+	def from_arrays(cls, V, src, dst, capacity, cost):
+		"""Build a cost network from parallel edge arrays"""
+		if len(dst) != len(src) or len(capacity) != len(src) or len(cost) != len(src):
+			raise ValueError("Edge arrays must have the same length")
+		network = cls(V)
+		for i in range(len(src)): network.add_edge(src[i], dst[i], capacity[i], cost[i])
+		return network
+
+	def add_edge(self, v, w, capacity, cost=0.0):
+		"""Add edge v->w with given capacity and unit cost and return its index"""
+		k = super().add_edge(v, w, capacity)
+		self.cost.extend((cost, -cost))
+		return k
+
+
+class MinCostFlow(MaxFlow):
+	"""Minimum-cost flow via successive shortest paths with potentials"""
+	def __init__(self, network, s, t, flow=None, scaling=False, d=4):
+		"""flow    -- value to send from s to t (capped at the maximum flow);
+		scaling -- use capacity scaling (fewer augmentations for large capacities);
+		d       -- arity of the indexed heap used by Dijkstra."""
+		super().__init__(network, s, t, None)
+		net = self.network
+		if not isinstance(net, CostNetwork): raise ValueError("Minimum-cost flow needs a CostNetwork")
+		V = len(net)
+		res = net.res
+		limit = Dinic(net.copy(), s, t).value #supply must be feasible, or flow gets stranded
+		if limit == float("inf"): raise ValueError("Unbounded flow (path of infinite capacity)")
+		flow = limit if flow is None else min(flow, limit)
+		self.excess = array("d", [0.0]) * V #supply (> 0) or demand (< 0) left
+		self.excess[s], self.excess[t] = flow, -flow
+		self.potential = array("d", [0.0]) * V
+		self.pq = IndexMinPQ(V, d)
+
+		thresholds = [0] #0 means any positive residual capacity
+		if scaling: 
+			U = max([r for r in res if r < float("inf")] + [flow if flow < float("inf") else 0])
+			if U >= 1: thresholds = [1 << k for k in range(int(U).bit_length()-1, -1, -1)] + [0]
+		for delta in thresholds: 
+			self._saturate(delta)
+			while self._augment(delta): pass 
+
+		self.value = self._inflow()
+		self.cost = sum(net.cost[2*k] * net.flow(k) for k in range(net.E()))
+
+	def _saturate(self, delta):
+		"""Saturate residual arcs (>= delta) of negative reduced cost"""
+		net, pi, excess = self.network, self.potential, self.excess
+		adj, head, res, cost = net.adj, net.head, net.res, net.cost
+		for v in range(len(net)): 
+			for e in adj[v]: 
+				r, w = res[e], head[e]
+				if r > 0 and r >= delta and cost[e] + pi[v] - pi[w] < 0: 
+					res[e] = 0.0
+					res[e ^ 1] += r
+					excess[v] -= r
+					excess[w] += r
+
+	def _augment(self, delta):
+		"""Send flow along a cheapest path from a supply to a demand vertex 
+		(both >= delta) over arcs of residual capacity >= delta; return False 
+		if there is none"""
+		net, pi, excess, pq = self.network, self.potential, self.excess, self.pq
+		adj, head, res, cost = net.adj, net.head, net.res, net.cost
+		V = len(net)
+		inf = float("inf")
+		dist = array("d", [inf]) * V
+		edge_to = array("l", [-1]) * V
+		settled = bytearray(V)
+		for v in range(V): 
+			if excess[v] > 0 and excess[v] >= delta: 
+				dist[v] = 0.0
+				pq.insert(v, 0.0)
+		sink = -1
+		while pq: 
+			v = pq.del_min()
+			settled[v] = 1
+			if excess[v] < 0 and -excess[v] >= delta: #cheapest demand vertex
+				sink = v
+				break 
+			for e in adj[v]: 
+				r = res[e]
+				if r <= 0 or r < delta: continue 
+				w = head[e]
+				nd = dist[v] + max(0.0, cost[e] + pi[v] - pi[w]) #clamp round-off
+				if nd < dist[w]: 
+					dist[w] = nd
+					edge_to[w] = e
+					if w in pq: pq.decrease_key(w, nd)
+					else: pq.insert(w, nd)
+		pq.clear()
+		if sink < 0: return False 
+		bound = dist[sink]
+		for v in range(V): pi[v] += dist[v] if settled[v] else bound
+
+		amount = -excess[sink]
+		v = sink 
+		while edge_to[v] != -1: #bottleneck
+			e = edge_to[v]
+			amount = min(amount, res[e])
+			v = head[e ^ 1]
+		amount = min(amount, excess[v])
+		excess[v] -= amount
+		excess[sink] += amount
+		v = sink
+		while edge_to[v] != -1: 
+			e = edge_to[v]
+			res[e] -= amount
+			res[e ^ 1] += amount
+			v = head[e ^ 1]
+		return True 
+
+
+def assignment(costs, scaling=False):
+	"""Solve the assignment problem for a cost matrix (rows are agents and 
+	columns tasks, None or inf forbids a pair); return (match, cost) where 
+	match[i] is the task of agent i (-1 if none), with as many agents as 
+	possible matched at minimum total cost"""
+	n = len(costs)
+	m = max(map(len, costs), default=0)
+	network = CostNetwork(n + m + 2)
+	s, t = n + m, n + m + 1
+	for i in range(n): network.add_edge(s, i, 1)
+	for j in range(m): network.add_edge(n + j, t, 1)
+	first = network.E()
+	for i, row in enumerate(costs): 
+		for j, c in enumerate(row): 
+			if c is not None and c < float("inf"): network.add_edge(i, n + j, 1, c)
+	mcf = MinCostFlow(network, s, t, scaling=scaling)
+	match = [-1] * n
+	for k in range(first, network.E()): 
+		if network.flow(k) > 0.5: 
+			i, j = network.endpoints(k)
+			match[i] = j - n
+	return match, mcf.cost
+
+
+"""INCREMENTAL MAXIMUM FLOW
+Keep the residual network of a maximum flow and repair it after edges change
+instead of solving from zero: 
+* raising the capacity of edge v->w (or adding an edge) keeps the flow valid;
+  it can only grow along an augmenting path through the new room on v->w, 
+  so if v is not on the s side of the last min cut the flow is still maximum;
+* lowering the capacity c of edge v->w below its flow f cuts the flow to c, 
+  leaving excess f-c at v and a deficit at w. Excess is pushed (BFS on the 
+  residual network) to the nearest deficit vertex or back to s/t, deficits 
+  are filled from s/t, and then augmenting paths (Dinic phases) restore a 
+  maximum flow. The searches stop at the nearest vertex that can take the 
+  imbalance, so small changes touch a small part of the network. 
+"""
+
+class IncrementalMaxFlow(Dinic):
+	"""Maximum flow that is re-solved incrementally after capacity changes"""
+	def __init__(self, network, s, t, method="dinic"):
+		"""Solve from scratch with given engine and keep the residual network"""
+		MaxFlow.__init__(self, network, s, t, method)
+		self._excess = {} #vertex -> imbalance left by capacity cuts (not s, t)
+		self._grown = []  #edges with new residual room since last solve
+
+	def set_capacity(self, k, capacity):
+		"""Change capacity of edge k (call resolve() to restore a max flow)"""
+		if capacity < 0: raise ValueError("Edge capacity must be non-negative")
+		net = self.network
+		flow = net.flow(k)
+		if capacity >= flow: 
+			if capacity > net.capacity(k): self._grown.append(k)
+			elif capacity < net.capacity(k): self._marked = None #s side may shrink
+			net.res[2*k] = capacity - flow
+			return 
+		v, w = net.endpoints(k)
+		net.res[2*k], net.res[2*k+1] = 0.0, capacity #cut flow to capacity
+		for u, delta in ((v, flow - capacity), (w, capacity - flow)): 
+			if u != self.s and u != self.t: 
+				self._excess[u] = self._excess.get(u, 0.0) + delta
+		self._marked = None
+
+	def add_edge(self, v, w, capacity):
+		"""Add edge v->w and return its index (call resolve() to use it)"""
+		k = self.network.add_edge(v, w, capacity)
+		self._grown.append(k)
+		return k
+
+	def resolve(self):
+		"""Restore a maximum flow after changes; return its value"""
+		repaired = any(self._excess.values())
+		self._repair()
+		grown, self._grown = self._grown, []
+		head = self.network.head
+		if repaired or any(self.in_cut(head[2*k+1]) for k in grown): #else old cut still blocks
+			V = len(self.network)
+			level = array("l", [-1]) * V
+			while self._levels(level): 
+				self._blocking(level, array("l", [0]) * V)
+			self._marked = None
+		self.value = self._inflow()
+		return self.value
+
+	def _repair(self):
+		"""Route excesses left by capacity cuts to deficits or to s/t, then fill
+		remaining deficits from s/t"""
+		res, excess = self.network.res, self._excess
+		terminal = lambda u: u == self.s or u == self.t
+		for v in [v for v in excess if excess[v] > 0]: 
+			while excess[v] > 0: 
+				found = self._path(v, lambda u: terminal(u) or excess.get(u, 0.0) < 0)
+				if found is None: break 
+				u, arcs = found
+				amount = min([excess[v]] + [res[a] for a in arcs] + ([] if terminal(u) else [-excess[u]]))
+				self._push(arcs, amount)
+				excess[v] -= amount
+				if not terminal(u): excess[u] += amount
+		for w in [w for w in excess if excess[w] < 0]: 
+			while excess[w] < 0: 
+				found = self._path(w, terminal, reverse=True)
+				if found is None: break 
+				u, arcs = found
+				amount = min([-excess[w]] + [res[a] for a in arcs])
+				self._push(arcs, amount)
+				excess[w] += amount
+		self._excess = {} #only float round-off can be left
+
+	def _path(self, source, target, reverse=False):
+		"""BFS over residual arcs leaving source (entering it if reverse) to the
+		nearest other vertex u with target(u); return (u, arcs) or None"""
+		adj, head, res = self.network.adj, self.network.head, self.network.res
+		edge_to = {source: -1}
+		queue = [source]
+		i = 0
+		while i < len(queue): 
+			x = queue[i]
+			i += 1
+			if x != source and target(x): 
+				u, arcs = x, []
+				while edge_to[x] != -1: 
+					a = edge_to[x]
+					arcs.append(a)
+					x = head[a] if reverse else head[a ^ 1]
+				return u, arcs
+			for e in adj[x]: 
+				a = e ^ 1 if reverse else e #residual arc x->y (y->x if reverse)
+				y = head[e]
+				if res[a] > 0 and y not in edge_to: 
+					edge_to[y] = a
+					queue.append(y)
+		return None 
+
+	def _push(self, arcs, amount):
+		"""Send amount along given residual arcs"""
+		res = self.network.res
+		for a in arcs: 
+			res[a] -= amount
+			res[a ^ 1] += amount
@@ -0,0 +1,49 @@
+import random
+
+from csr import CSRGraph
+from minspan import AllPairsSP, DijkstraSP, MaxFlow, ResidualNetwork
+
+
+def test_query_after_source():
+	"""query() on a DijkstraSP built with a source must not start from its SPT"""
+	random.seed(13)
+	V = 60
+	edges = [(random.randrange(V), random.randrange(V), random.randint(1, 20)) for _ in range(240)]
+	graph = CSRGraph.from_edges(V, edges, directed=True)
+	full = [DijkstraSP(graph, s)._dist_to for s in range(V)]
+	sourced, plain = DijkstraSP(graph, 0), DijkstraSP(graph)
+	for _ in range(50):
+		s, t = random.randrange(V), random.randrange(V)
+		assert sourced.query(s, t) == plain.query(s, t) == full[s][t]
+
+
+def test_landmarks_count():
+	"""Chosen landmarks are not consumed, and k tops them up"""
+	graph = CSRGraph.from_edges(8, [(v, (v + 1) % 8, 1.0) for v in range(8)], directed=True)
+	chosen = [1, 2, 3]
+	sp = DijkstraSP(graph).landmarks(chosen=chosen)
+	assert chosen == [1, 2, 3] and len(sp._lm_from) == 3
+	sp = DijkstraSP(graph).landmarks(k=4, chosen=[5])
+	assert len(sp._lm_from) == 4 and sp._lm_from[0][5] == 0.0
+	assert sp.query(6, 4, "alt") == 6.0
+
+
+def test_min_cut():
+	"""in_cut(v) answers for v even on the first call, min cut = max flow"""
+	for method in ("ford_fulkerson", "dinic", "push_relabel"):
+		network = ResidualNetwork.from_arrays(4, [0, 0, 1, 2], [1, 2, 3, 3], [2, 1, 1, 2])
+		flow = MaxFlow(network, 0, 3, method)
+		assert not flow.in_cut(3) and flow.in_cut(0)
+		assert sum(network.capacity(k) for k in flow.min_cut()) == flow.value == 2
+
+
+def test_apsp_reopen(tmp_path):
+	"""A distance matrix written with path= reopens without recomputation"""
+	graph = CSRGraph.from_edges(4, [(0, 1, 1.0), (1, 2, 2.0), (2, 0, 1.5), (0, 3, 9.0)], directed=True)
+	path = str(tmp_path / "apsp.bin")
+	for method in ("johnson", "floyd"):
+		apsp = AllPairsSP(graph, method, path=path)
+		reopened = AllPairsSP.open(path)
+		assert reopened.V == 4 and not reopened.has_negcycle()
+		assert all(reopened.dist(s, t) == apsp.dist(s, t) for s in range(4) for t in range(4))
+		assert reopened.dist(1, 3) == 12.5
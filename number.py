@@ -35,7 +35,8 @@ Rabin (1980) "Probabilistic algorithm for testing primality
 """
 
 from random import randrange, getrandbits
-from math import sqrt
+from math import sqrt, isqrt, gcd, prod
+from itertools import compress
 
 def isprime(n):
 	"""Returns True if the input is a prime number.
@@ -55,7 +56,9 @@ def isprime(n):
 
 def primes(n, method="eratosthenes"):
 	"""Return all prime numbers upto a given number (inclusive)"""
+	if n < 2: return []
 	if method.lower() == "eratosthenes":
+		if n > 2*SEGMENT: return list(iter_primes(2, n+1)) #bounded memory
 		return _eratosthenes(n)
 	elif method.lower() == "sundaram":
 		return _sundaram((n-1)//2)
@@ -63,18 +66,20 @@ def primes(n, method="eratosthenes"):
 def _eratosthenes(n):
 	"""Sieve of Eratosthenes
 	
-	An array of bits hi is used to mark primality, i.e. 
-	mark[i] is True if i+1 is prime
+	A bytearray of odd numbers only is used to mark primality, i.e. 
+	sieve[i] is 1 if 2*i+1 is prime. The odd multiples of a prime p from p*p
+	are p indices apart, so each p is crossed out by one slice assignment.
 	Eratosthenes -- ancient Greek mathematician
 	"""
-	prime = [False] + [True] * (n-1)
-	k = 2
-	while k * k <= n:
-		if prime[k-1]:
-			for i in range(k*k, n+1, k):
-				prime[i-1] = False 
-		k += 1
-	return [i+1 for i, p in enumerate(prime) if p]
+	if n < 2: return []
+	sieve = bytearray([1]) * ((n+1)//2) #1, 3, 5, ..., n
+	sieve[0] = 0 
+	for i in range(1, (isqrt(n)+1)//2):
+		if sieve[i]:
+			p = 2*i+1
+			start = p*p//2
+			sieve[start::p] = bytes((len(sieve)-start-1)//p + 1)
+	return [2] + list(compress(range(1, n+1, 2), sieve))
 
 def _sundaram(n):
 	"""Sieve of Sundaram
@@ -85,57 +90,125 @@ def _sundaram(n):
 	2) i + j + 2*i*j <= n
 	The remaining numbers are doubled and incremented by one, giving a list 
 	of the odd prime numbers (i.e., all primes except 2)
+	For fixed i these numbers start at 2*i*(i+1) with step 2*i+1, so each i 
+	is one slice assignment. 
 	"""
-	mark = [True] * n
-	for i in range(1, n//3+1):
-		for j in range(1, (n-i)//(2*i+1)+1):
-			mark[i+j+2*i*j - 1] = False 
+	if n < 1: return [2] if n == 0 else []
+	mark = bytearray([1]) * n
+	i = 1
+	while 2*i*(i+1) <= n:
+		start = 2*i*(i+1) - 1
+		mark[start::2*i+1] = bytes((n-start-1)//(2*i+1) + 1)
+		i += 1
 	return [2] + [2*(i+1)+1 for i, flag in enumerate(mark) if flag]
 
 
+"""SEGMENTED SIEVE
+Sieving [lo, hi) only needs the primes up to sqrt(hi). The interval is cut
+into windows of SEGMENT odd numbers (256 KB, about an L2 cache), each sieved
+by the base primes with slice assignments and then discarded, so memory stays
+bounded by the window plus the base primes (~ sqrt(hi)/ln(hi) of them), e.g.
+about 6500 base primes for hi = 10**12.
+"""
+SEGMENT = 1 << 18 #odd numbers per window
+
+def iter_primes(lo=2, hi=None, segment=SEGMENT):
+	"""Yield primes p with lo <= p < hi in increasing order (without end if
+	hi is None), sieving one window of given size at a time"""
+	if lo <= 2 and (hi is None or hi > 2): yield 2
+	lo = max(lo, 3) | 1 #first odd candidate
+	base, bound = [], 1 #odd primes up to bound
+	while hi is None or lo < hi:
+		end = lo + 2*segment if hi is None else min(lo + 2*segment, hi)
+		if bound * bound < end: 
+			bound = isqrt(end if hi is None else hi - 1) 
+			if hi is None: bound = max(bound, 2*isqrt(end)) #grow ahead
+			base = _eratosthenes(bound)[1:]
+		count = (end - lo + 1)//2 #odd numbers lo, lo+2, ... < end
+		sieve = bytearray([1]) * count
+		for p in base:
+			if p*p >= end: break 
+			start = max(p*p, (lo + p - 1)//p*p)
+			if start % 2 == 0: start += p #odd multiples only
+			i = (start - lo)//2
+			if i < count: sieve[i::p] = bytes((count-i-1)//p + 1)
+		yield from compress(range(lo, end, 2), sieve)
+		lo = end | 1
+
+
+"""DETERMINISTIC MILLER-RABIN
+Below a bound, a fixed set of bases contains a witness for every composite 
+(found by exhaustive search), so those bases alone make the test exact, e.g.
+bases 2, 3, 5, 7 for n < 3215031751 and Sinclair's 7 bases for n < 2**64 
+(instead of 128 random rounds). Above 3.3*10**24 random bases are used, each
+round passing a composite with probability <= 1/4. 
+
+Trial division by the primes below 1000 first (a single gcd with their 
+product) rejects ~ 92% of random odd candidates without any modular 
+exponentiation.
+"""
+WITNESSES = [ #(bound, bases) -- bases are witnesses for all composite n < bound
+	(2047, (2,)),
+	(1373653, (2, 3)),
+	(25326001, (2, 3, 5)),
+	(3215031751, (2, 3, 5, 7)),
+	(2152302898747, (2, 3, 5, 7, 11)),
+	(3474749660383, (2, 3, 5, 7, 11, 13)),
+	(341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+	(1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),
+	(318665857834031151167461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+	(3317044064679887385961981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+]
+SMALL_PRIMES = _eratosthenes(1000)
+_SMALL = frozenset(SMALL_PRIMES)
+_PRIMORIAL = prod(SMALL_PRIMES)
+
+
 class MillerRabin:
 	"""Miller-Rabin random prime generator"""
 	def __init__(self, bits):
 		self.bits = bits
 
 	def isprime(self, n, k=128):
-	    """Miller-Rabin primality test
-	    The goal of Miller-Rabin is to find a nontrivial square roots of 1 modulo n.
-	Take back the Fermat’s little theorem: a**(n-1) = 1 (mod n).
-	For Miller-Rabin, we need to find r and s 
-	     Test if a number is prime
-	        Args:
-	            n -- int -- the number to test
-	            k -- int -- the number of tests to do
-	        return True if n is prime
-	    """
-	    # Test if n is not even.
-	    # But care, 2 is prime !
-	    if n == 2 or n == 3: return True
-	    if n <= 1 or n % 2 == 0: return False
-	    # find r and s such that (n-1) = r*(2**s) where r is odd
-	    s, r = 0, n - 1
-	    while r & 1 == 0:
-	        s += 1
-	        r //= 2
+		"""Miller-Rabin primality test
+		The goal of Miller-Rabin is to find a nontrivial square roots of 1 modulo n.
+		Take back the Fermat’s little theorem: a**(n-1) = 1 (mod n).
+		For Miller-Rabin, we need to find r and s 
+		     Test if a number is prime
+		        Args:
+		            n -- int -- the number to test
+		            k -- int -- the number of tests to do (n >= 3.3*10**24 only,
+		                        smaller n are tested with fixed bases exactly)
+		        return True if n is prime
+		"""
+		if n <= SMALL_PRIMES[-1]: return n in _SMALL
+		if gcd(n, _PRIMORIAL) != 1: return False #small prime factor
+		# find r and s such that (n-1) = r*(2**s) where r is odd
+		s, r = 0, n - 1
+		while r & 1 == 0:
+			s += 1
+			r //= 2
 		#if ∀ j ∈ [0, s-1],  a**r != 1 (mod n) and a**((2**j)*r) != -1 (mod n), 
 		#then n is not prime and a is called a strong witness to compositeness for n.
 		#if ∃ j ∈ [0, s-1], a**r = 1 (mod n) or a**((2**j)*r) = -1 (mod n), 
 		#then n is said to be a strong pseudo-prime to the base a, and a is called a strong liar to primality for n.
-	    for _ in range(k):
-	    	#pick a, an integer in the range of [2, n-1]
-	        a = randrange(2, n - 1) 
-	        #If a**r != 1 (mod n) and a**((2**j)*r) != -1 (mod n) for all j such that 0 ≤ j ≤ s-1
-	        #n is not prime and a is called a strong witness to compositeness for n.
-	        x = pow(a, r, n) #a**r % n
-	        if x != 1 and x != n - 1:
-	            j = 1
-	            while j < s and x != n - 1:
-	                x = pow(x, 2, n)
-	                if x == 1: return False
-	                j += 1
-	            if x != n - 1: return False
-	    return True
+		bases = next((bases for bound, bases in WITNESSES if n < bound), None)
+		if bases is None: #pick a, an integer in the range of [2, n-1]
+			bases = (randrange(2, n - 1) for _ in range(k))
+		for a in bases:
+			a %= n
+			if a == 0: continue #n divides the base, no information
+			#If a**r != 1 (mod n) and a**((2**j)*r) != -1 (mod n) for all j such that 0 ≤ j ≤ s-1
+			#n is not prime and a is called a strong witness to compositeness for n.
+			x = pow(a, r, n) #a**r % n
+			if x != 1 and x != n - 1:
+				j = 1
+				while j < s and x != n - 1:
+					x = pow(x, 2, n)
+					if x == 1: return False
+					j += 1
+				if x != n - 1: return False
+		return True
 
 	def _candidate(self):
 	    """ Generate an odd integer randomly
@@ -169,11 +242,108 @@ class MillerRabin:
 def randprime(bits):
 	"""Return a randon prime number of given bits"""
 	rpg = MillerRabin(bits) #random prime generator
-	n = rpg.generate()
-	if not isprime(n):
-		n = rpg.generate()
-	return n 
+	return rpg.generate() #exact below 3.3*10**24, else error <= 4**-128
+
+
+def isprime_many(ns, k=128):
+	"""Return list of primality flags of given integers (Miller-Rabin with 
+	fixed bases where they suffice, k random rounds beyond)"""
+	test = MillerRabin(0).isprime
+	return [test(n, k) for n in ns]
+
+
+
+"""SIEVED PRIME SEARCH
+Instead of drawing independent candidates, the odd numbers of given bits are
+cut into windows of W consecutive odd numbers x, x+2, ..., x+2(W-1), and a 
+window is sieved by the first few thousand primes before any Miller-Rabin: 
+for prime p the multiples sit at x + 2i = 0 (mod p), i.e. every p-th slot 
+from i = -x/2 (mod p), crossed out by one slice assignment. About 11% of the
+odd numbers survive the primes below 2**15, so ~ 9 of 10 candidates cost 
+one small modulo instead of a modular exponentiation.
+
+The search starts at a uniformly random odd number of given bits and moves 
+on through consecutive windows, wrapping around at the end of the range, so 
+they never overlap. W is capped at 1/8 of the range, so there are always many
+windows to start in; ranges of fewer than 1024 odd numbers (bits <= 11) use 
+plain rejection sampling (MillerRabin.generate) instead. With workers > 1
+consecutive windows are sieved and tested in worker processes, and the first 
+prime returned wins: a shared stop flag makes windows still running give up
+at their next candidate, so the call returns without waiting for them. Bulk
+generation can pass one long-lived executor (pool=) instead of spinning up a
+pool per prime. 
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing.shared_memory import SharedMemory
+import os
+
+SIEVE_PRIMES = _eratosthenes(1 << 15)[1:] #odd primes, 3511 of them
+
+def _window(x, W, k=128, stop=None):
+	"""Worker -- sieve odd numbers x, x+2, ..., x+2(W-1) by SIEVE_PRIMES and
+	return the first survivor passing Miller-Rabin (None if there is none, or
+	once the 1-byte shared memory flag named stop is set)"""
+	flag = None
+	if stop is not None: 
+		try: flag = SharedMemory(name=stop)
+		except FileNotFoundError: return None #search is already over
+	try: 
+		sieve = bytearray([1]) * W
+		for p in SIEVE_PRIMES:
+			if p >= x: break #p itself may be a candidate
+			i = (p - x % p) * ((p + 1) >> 1) % p #(p+1)/2 is the inverse of 2
+			sieve[i::p] = bytes(len(range(i, W, p)))
+		test = MillerRabin(0).isprime
+		for i in compress(range(W), sieve):
+			if flag is not None and flag.buf[0]: return None 
+			if test(x + 2*i, k): return x + 2*i
+		return None
+	finally: 
+		if flag is not None: flag.close()
+
+
+def _windows(lo, N, W, i):
+	"""Yield (start, size) of consecutive windows of at most W of the N odd 
+	numbers lo, lo+2, ..., from the i-th on, wrapping around at the end"""
+	while True:
+		size = min(W, N - i)
+		yield lo + 2*i, size
+		i = (i + size) % N
+
 
+def randprime_sieved(bits, workers=None, window=None, k=128, pool=None):
+	"""Return a random prime of given bits by sieving windows of odd numbers
+	(window odd numbers each, workers > 1 searches windows in parallel in a 
+	new process pool, or in given pool with workers windows in flight)"""
+	if bits < 2: raise ValueError("A prime has at least 2 bits")
+	N = 1 << bits - 2 #odd numbers of given bits
+	if N < 1 << 10: return MillerRabin(bits).generate() #too few for windows
+	if window is not None and window < 1: raise ValueError("Window must be positive")
+	W = min(window or 1 << bits.bit_length() + 1, N >> 3)
+	starts = _windows(1 << bits - 1 | 1, N, W, randrange(N))
+	if pool is None and (not workers or workers < 2):
+		for x, size in starts:
+			p = _window(x, size, k)
+			if p: return p
+	own = pool is None
+	if own: pool = ProcessPoolExecutor(workers)
+	workers = workers or os.cpu_count() or 1
+	stop = SharedMemory(create=True, size=1)
+	running = set()
+	try: 
+		running = {pool.submit(_window, *next(starts), k, stop.name) for _ in range(workers)}
+		while True:
+			done, running = wait(running, return_when=FIRST_COMPLETED)
+			for future in done:
+				p = future.result()
+				if p: return p
+				running.add(pool.submit(_window, *next(starts), k, stop.name))
+	finally: 
+		stop.buf[0] = 1 #windows still running give up at their next candidate
+		for other in running: other.cancel()
+		if own: pool.shutdown(wait=False, cancel_futures=True)
+		stop.close()
+		stop.unlink()
 
 if __name__ == "__main__":
 	primes = _eratosthenes(100)
@@ -22,6 +22,9 @@ Reference:
 [1] https://algs4.cs.princeton.edu/
 """
 
+from array import array
+from typing import Iterable, Tuple
+
 class UnionFind:
 	"""UnionFind abstracts union-find problem into a parent array, in 
 	which two objects, p & q, are connected iff their roots	are the same.
@@ -31,30 +34,248 @@ class UnionFind:
 	In addition, two techniques are used to improve performance: 
 	1) find with path compression, which updates parent to root while search for it.
 	2) uion with rank, which links smaller tree to larger tree;
+
+	Path compression is done iteratively (no recursion on long chains) by 
+	either one-pass variant of Tarjan & van Leeuwen:
+	* halving -- point every other node on the path to its grandparent;
+	* splitting -- point every node on the path to its grandparent.
+
+	Parent and size live in array("l") storage (8 bytes per entry instead of 
+	a list slot plus an int object), which grows as new elements are added.
 	"""
 
-	def __init__(self, n: int):
+	def __init__(self, n: int = 0):
 		"""Initialize a UnionFind object ~ O(N)
 		In UnionFind, connected components are reflected in common roots. 
 		"""
-		self.parent = list(range(n)) # parent array (to reflect subsets)
-		self.rank = [1] * n          # size of subtree
+		self.parent = array("l", range(n)) # parent array (to reflect subsets)
+		self.rank = array("l", [1]) * n    # size of subtree
+		self.count = n                     # number of disjoint components
+
+	def __len__(self) -> int:
+		"""Return number of elements"""
+		return len(self.parent)
+
+	def grow(self, n: int) -> None:
+		"""Add singletons so that elements 0, 1, ..., n-1 exist ~ O(1) amortized"""
+		m = len(self.parent)
+		if n > m: 
+			self.parent.extend(range(m, n))
+			self.rank.extend(array("l", [1]) * (n-m))
+			self.count += n - m
+
+	def add(self) -> int:
+		"""Add a new singleton and return its index"""
+		self.grow(len(self.parent) + 1)
+		return len(self.parent) - 1
 
 	def find(self, p: int, halving: bool=True) -> int:
 		"""Find with path compression ~ O(1) on average."""
-		if p != self.parent[p]:
-			self.parent[p] = self.find(self.parent[p]) # path compression
-		return self.parent[p]
+		parent = self.parent
+		if halving: 
+			while p != parent[p]:
+				parent[p] = parent[parent[p]] # path halving
+				p = parent[p]
+		else: 
+			while p != parent[p]:
+				q = parent[p]
+				parent[p] = parent[q] # path splitting
+				p = q
+		return p
 
 	def union(self, p: int, q: int) -> bool:
 		"""Union with rank ~ O(1) on average"""
+		if p >= len(self.parent) or q >= len(self.parent): self.grow(max(p, q) + 1)
 		prt, qrt = self.find(p), self.find(q)
 		if prt == qrt: return False # already linked
 		if self.rank[prt] > self.rank[qrt]: prt, qrt = qrt, prt # rank[prt] <= rank[qrt]
 		self.parent[prt] = qrt
 		self.rank[qrt] += self.rank[prt]
+		self.count -= 1
+		return True
+
+	def connected(self, p: int, q: int) -> bool:
+		"""Return True if p and q are in the same subset"""
+		return self.find(p) == self.find(q)
+
+	def union_many(self, pairs: Iterable[Tuple[int, int]]) -> int:
+		"""Union every (p, q) pair and return the number of merges
+
+		Same as calling union() in a loop, but with the finds inlined and 
+		attribute lookups hoisted out of the loop.
+		"""
+		parent, rank = self.parent, self.rank
+		merges = 0
+		for p, q in pairs:
+			if p >= len(parent) or q >= len(parent): self.grow(max(p, q) + 1)
+			while p != parent[p]:
+				parent[p] = parent[parent[p]]
+				p = parent[p]
+			while q != parent[q]:
+				parent[q] = parent[parent[q]]
+				q = parent[q]
+			if p == q: continue 
+			if rank[p] > rank[q]: p, q = q, p
+			parent[p] = q
+			rank[q] += rank[p]
+			merges += 1
+		self.count -= merges
+		return merges
+
+	def find_many(self, indices: Iterable[int]) -> array:
+		"""Return the roots of given elements as an array"""
+		parent = self.parent
+		roots = array("l")
+		for p in indices:
+			while p != parent[p]:
+				parent[p] = parent[parent[p]]
+				p = parent[p]
+			roots.append(p)
+		return roots
+
+
+class RollbackUnionFind(UnionFind):
+	"""UnionFind that can undo its unions (aka persistent union-find)
+
+	Path compression is dropped (it would rewrite many parents per find), so
+	only union with rank keeps trees O(logN) deep. Every successful union 
+	appends the linked root to an undo log, thus
+	* snapshot() returns the current log length as a token;
+	* rollback(token) undoes unions back to that token, O(1) per union.
+	"""
+
+	def __init__(self, n: int = 0):
+		super().__init__(n)
+		self.history = array("l") # roots linked under another root
+
+	def find(self, p: int, halving: bool=True) -> int:
+		"""Find without path compression ~ O(logN)"""
+		parent = self.parent
+		while p != parent[p]: p = parent[p]
+		return p
+
+	def union(self, p: int, q: int) -> bool:
+		"""Union with rank (logged) ~ O(logN)"""
+		if p >= len(self.parent) or q >= len(self.parent): self.grow(max(p, q) + 1)
+		prt, qrt = self.find(p), self.find(q)
+		if prt == qrt: return False 
+		if self.rank[prt] > self.rank[qrt]: prt, qrt = qrt, prt 
+		self.parent[prt] = qrt
+		self.rank[qrt] += self.rank[prt]
+		self.count -= 1
+		self.history.append(prt)
 		return True
 
+	def union_many(self, pairs: Iterable[Tuple[int, int]]) -> int:
+		"""Union every (p, q) pair and return the number of merges"""
+		return sum(self.union(p, q) for p, q in pairs)
+
+	def find_many(self, indices: Iterable[int]) -> array:
+		"""Return the roots of given elements as an array"""
+		return array("l", map(self.find, indices))
+
+	def snapshot(self) -> int:
+		"""Return a token for the current state"""
+		return len(self.history)
+
+	def rollback(self, token: int) -> None:
+		"""Undo all unions made after snapshot token was taken"""
+		parent, rank, history = self.parent, self.rank, self.history
+		if not 0 <= token <= len(history): raise ValueError("Invalid snapshot token")
+		while len(history) > token:
+			p = history.pop()
+			rank[parent[p]] -= rank[p]
+			parent[p] = p
+			self.count += 1
+
+
+"""OFFLINE DYNAMIC CONNECTIVITY
+Given a batch of edge insertions & deletions over n vertices and queries 
+"are u and v connected at time t", answer all queries at once:
+1) each edge is alive over an interval of time [added, removed);
+2) store the interval at the O(logT) nodes of a segment tree over time 
+   that cover it;
+3) walk the segment tree depth-first, union the edges of a node on entry 
+   and roll them back on exit, so at leaf t exactly the edges alive at time 
+   t are unioned. 
+Total time ~ O((N + Q) log(N) log(T)) for N edge events and Q queries.
+"""
+
+class DynamicConnectivity:
+	"""Offline connectivity over a timeline of add/remove edge events"""
+
+	def __init__(self, n: int, events: Iterable[Tuple[str, int, int]]):
+		"""events[i] is ("add", u, v) or ("remove", u, v), applied at step i; 
+		time t refers to the graph after the first t events."""
+		self.n = n 
+		self.T = 0         # number of events
+		self.eu = array("l") # edge intervals [start, end) in time
+		self.ev = array("l")
+		self.start = array("l")
+		self.end = array("l")
+		alive = {} # edge -> start times of its live copies
+		for i, (op, u, v) in enumerate(events):
+			key = (u, v) if u < v else (v, u)
+			if op == "add": 
+				alive.setdefault(key, []).append(i+1)
+			elif op == "remove": 
+				if not alive.get(key): raise ValueError(f"Edge {u}-{v} removed at step {i} but not present")
+				self._interval(key, alive[key].pop(), i+1)
+			else: 
+				raise ValueError(f"Unknown event {op!r}")
+			self.T = i + 1
+		for key, starts in alive.items(): 
+			for t in starts: self._interval(key, t, self.T+1)
+
+	def _interval(self, key, start, end):
+		"""Record that edge key is alive over times [start, end)"""
+		if start < end:
+			self.eu.append(key[0])
+			self.ev.append(key[1])
+			self.start.append(start)
+			self.end.append(end)
+
+	def query(self, queries: Iterable[Tuple[int, int, int]]) -> list:
+		"""Return for each (t, u, v) whether u and v are connected at time t"""
+		queries = list(queries)
+		S = 1
+		while S < self.T + 1: S *= 2 # leaves are times 0, 1, ..., T
+		tree = {} # segment tree node -> edge indices covering it
+		for e in range(len(self.eu)):
+			lo, hi = self.start[e] + S, self.end[e] + S
+			while lo < hi: 
+				if lo & 1: 
+					tree.setdefault(lo, []).append(e)
+					lo += 1
+				if hi & 1: 
+					hi -= 1
+					tree.setdefault(hi, []).append(e)
+				lo //= 2
+				hi //= 2
+		at = {} # leaf time -> query indices
+		for i, (t, u, v) in enumerate(queries): 
+			if not 0 <= t <= self.T: raise ValueError(f"Time {t} out of range")
+			at.setdefault(t, []).append(i)
+
+		ans = [False] * len(queries)
+		uf = RollbackUnionFind(self.n)
+		stack = [(1, -1)] # (node, token); token -1 means entering
+		while stack:
+			k, token = stack.pop()
+			if token >= 0: 
+				uf.rollback(token) # leaving node k
+				continue 
+			stack.append((k, uf.snapshot()))
+			for e in tree.get(k, []): uf.union(self.eu[e], self.ev[e])
+			if k >= S: 
+				for i in at.get(k - S, []):
+					_, u, v = queries[i]
+					ans[i] = uf.find(u) == uf.find(v)
+			else: 
+				stack.append((2*k+1, -1))
+				stack.append((2*k, -1))
+		return ans
+
 
 if __name__ == "__main__": 
 	"""Test client for UnionFind"""
@@ -69,4 +290,5 @@ if __name__ == "__main__":
 	uf.union(5, 0)
 	uf.union(7, 2)
 	uf.union(6, 1)
-	print("5-0? ", uf.find(5) == uf.find(0)) # true
\ No newline at end of file
+	print("5-0? ", uf.find(5) == uf.find(0)) # true
+	print("count", uf.count) # 2
\ No newline at end of file